@@ -1,13 +1,47 @@
+import argparse
 import ast
 import builtins
+import csv
+import glob
+import hashlib
+import json
+import mmap
+import os
 import sys
-from typing import Set
-from textual.app import App, ComposeResult
-from textual.widgets import Static, Header, Footer, ListView, ListItem
-from textual.containers import Container
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple
+
+from analyzer_index import DEFINITION, USE, FileSymbols, SymbolIndex
+
+# Тяжёлые модули (пул процессов, sqlite, Textual) импортируются по месту
+# использования: анализатор часто запускается на один файл из pre-commit хуков
+if TYPE_CHECKING:
+    from analyzer_cache import AnalysisCache, CacheEntry
+
+# Категории имён, которые попадают в отчёт и переносятся между процессами
+CATEGORIES = (
+    "variables",
+    "constants",
+    "system_functions",
+    "system_procedures",
+    "user_functions",
+    "user_procedures",
+)
+
+
+# Имена встроенных функций вычисляются один раз на процесс
+BUILTIN_NAMES = frozenset(dir(builtins))
+
 
 class PythonCodeAnalyzer:
-    def __init__(self):
+    def __init__(self, track_files: bool = False, track_changes: bool = False,
+                 build_index: bool = False):
+        """``track_files`` запоминает вклад каждого файла, чтобы при его
+        изменении или удалении можно было убрать старые имена (режим
+        наблюдения). ``track_changes`` копит появившиеся и исчезнувшие имена
+        до вызова ``take_changes``, чтобы интерфейс обновлял списки
+        точечно. ``build_index`` дополнительно строит ``index`` — где
+        определено и используется каждое имя; отчёту он не нужен, поэтому
+        по умолчанию выключен."""
         self.variables: Set[str] = set()
         self.constants: Set[str] = set()
         self.labels: Set[str] = set()
@@ -15,7 +49,19 @@ class PythonCodeAnalyzer:
         self.system_procedures: Set[str] = set()
         self.user_functions: Set[str] = set()
         self.user_procedures: Set[str] = set()
-        self.builtin_functions = set(dir(builtins))
+        self.builtin_functions = BUILTIN_NAMES
+        self.files_analyzed = 0
+        self.errors: Dict[str, str] = {}
+        # Где определены и используются имена (строится тем же обходом AST)
+        self.index: Optional[SymbolIndex] = SymbolIndex() if build_index else None
+        # Имена, появившиеся и исчезнувшие с последнего take_changes
+        self.track_changes = track_changes
+        self._added: Dict[str, Set[str]] = {category: set() for category in CATEGORIES}
+        self._removed: Dict[str, Set[str]] = {category: set() for category in CATEGORIES}
+        self.track_files = track_files
+        # Имена каждого файла и число файлов, в которых встречается имя
+        self._file_names: Dict[str, Dict[str, List[str]]] = {}
+        self._name_counts: Dict[str, Dict[str, int]] = {category: {} for category in CATEGORIES}
 
     def analyze_file(self, file_path: str) -> None:
         """Анализирует файл Python и собирает информацию о его компонентах."""
@@ -24,72 +70,577 @@ class PythonCodeAnalyzer:
                 source = file.read()
             
             tree = ast.parse(source)
-            self._analyze_ast(tree)
-            
+            self._analyze_ast(tree, file_path)
+            self.files_analyzed += 1
+
         except Exception as e:
             print(f"Ошибка при анализе файла: {e}")
             sys.exit(1)
 
-    def _analyze_ast(self, tree: ast.AST) -> None:
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает собранные имена (и индекс, если он строится) в виде словаря
+        для передачи между процессами."""
+        result: Dict[str, Any] = {category: sorted(getattr(self, category))
+                                  for category in CATEGORIES}
+        if self.index is not None:
+            result["index"] = self.index.to_dict()
+        return result
+
+    def merge(self, result: Dict[str, Any], path: Optional[str] = None) -> None:
+        """Добавляет результат анализа одного файла к общему отчёту.
+
+        Если файлы отслеживаются, прежний результат того же ``path``
+        заменяется новым.
+        """
+        if self.track_files and path is not None:
+            self.remove_file(path)
+            self._file_names[path] = {category: result[category] for category in CATEGORIES}
+            for category in CATEGORIES:
+                counts = self._name_counts[category]
+                for name in result[category]:
+                    counts[name] = counts.get(name, 0) + 1
+        for category in CATEGORIES:
+            names = getattr(self, category)
+            if not self.track_changes:
+                names.update(result[category])
+                continue
+            added = set(result[category]) - names
+            if added:
+                names.update(added)
+                removed = self._removed[category]
+                self._added[category].update(added - removed)
+                removed -= added
+        if self.index is not None and "index" in result:
+            self.index.merge(result["index"])
+        self.files_analyzed += 1
+
+    def remove_file(self, path: str) -> None:
+        """Убирает вклад файла: имена, которых больше нет ни в одном файле, исчезают."""
+        self.errors.pop(path, None)
+        file_names = self._file_names.pop(path, None)
+        if file_names is None:
+            return
+        for category, names in file_names.items():
+            counts = self._name_counts[category]
+            values = getattr(self, category)
+            for name in names:
+                counts[name] -= 1
+                if not counts[name]:
+                    del counts[name]
+                    values.discard(name)
+                    if self.track_changes:
+                        self._note_removed(category, name)
+        if self.index is not None:
+            self.index.remove_file(path)
+        self.files_analyzed -= 1
+
+    def remove_archive(self, path: str) -> None:
+        """Убирает вклад архива и всех модулей из него (``архив!модуль``)."""
+        prefix = path + ARCHIVE_SEPARATOR
+        members = [member for member in (*self._file_names, *self.errors)
+                   if member.startswith(prefix)]
+        for member in members:
+            self.remove_file(member)
+        self.remove_file(path)
+
+    def _note_removed(self, category: str, name: str) -> None:
+        added = self._added[category]
+        if name in added:
+            added.discard(name)
+        else:
+            self._removed[category].add(name)
+
+    def take_changes(self) -> Dict[str, Tuple[Set[str], Set[str]]]:
+        """Появившиеся и исчезнувшие имена каждой изменившейся категории
+        с прошлого вызова."""
+        changes = {category: (self._added[category], self._removed[category])
+                   for category in CATEGORIES
+                   if self._added[category] or self._removed[category]}
+        for category in changes:
+            self._added[category] = set()
+            self._removed[category] = set()
+        return changes
+
+    def _analyze_ast(self, tree: ast.AST, path: str = "<unknown>") -> None:
         """Анализирует AST дерево для извлечения компонентов."""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Name):
-                if isinstance(node.ctx, ast.Store):
-                    if node.id.isupper():
-                        self.constants.add(node.id)
-                    else:
-                        self.variables.add(node.id)
-            elif isinstance(node, ast.FunctionDef):
-                returns_value = any(isinstance(n, ast.Return) and n.value is not None for n in ast.walk(node))
-                if node.name in self.builtin_functions:
-                    if returns_value:
-                        self.system_functions.add(node.name)
-                    else:
-                        self.system_procedures.add(node.name)
-                else:
-                    if returns_value:
-                        self.user_functions.add(node.name)
-                    else:
-                        self.user_procedures.add(node.name)
-
-class AnalyzerApp(App):
-    CSS_PATH = "analyzer.css"  # Можно настроить внешний вид через CSS
+        if self.index is None:
+            _AstCollector(self).visit(tree)
+            return
+        symbols = FileSymbols(path)
+        _IndexingCollector(self, symbols).visit(tree)
+        self.index.add_file(symbols)
+
+    def _add_function(self, name: str, returns_value: bool) -> None:
+        """Относит определение функции к одной из четырёх категорий."""
+        if name in self.builtin_functions:
+            if returns_value:
+                self.system_functions.add(name)
+            else:
+                self.system_procedures.add(name)
+        else:
+            if returns_value:
+                self.user_functions.add(name)
+            else:
+                self.user_procedures.add(name)
+
+
+class _AstCollector(ast.NodeVisitor):
+    """Однопроходный обход AST.
+
+    Хранит стек областей видимости функций, поэтому каждый ``return``
+    относится только к ближайшей объемлющей функции, а дерево обходится
+    ровно один раз (вместо вложенного ``ast.walk`` для каждой функции).
+    """
 
     def __init__(self, analyzer: PythonCodeAnalyzer):
-        super().__init__()
         self.analyzer = analyzer
+        # Для каждой открытой функции: возвращает ли она значение
+        self.scopes: List[bool] = []
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Store):
+            if node.id.isupper():
+                self.analyzer.constants.add(node.id)
+            else:
+                self.analyzer.variables.add(node.id)
+
+    def visit_Return(self, node: ast.Return) -> None:
+        if node.value is not None and self.scopes:
+            self.scopes[-1] = True
+        self.generic_visit(node)
+
+    def _visit_function(self, node) -> None:
+        self.scopes.append(False)
+        self.generic_visit(node)
+        returns_value = self.scopes.pop()
+        self.analyzer._add_function(node.name, returns_value)
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        # Лямбда анонимна и не попадает в отчёт, но открывает свою область,
+        # чтобы её тело не влияло на объемлющую функцию
+        self.scopes.append(True)
+        self.generic_visit(node)
+        self.scopes.pop()
+
+
+class _IndexingCollector(_AstCollector):
+    """Тот же обход, который заодно записывает вхождения имён в ``FileSymbols``."""
+
+    def __init__(self, analyzer: PythonCodeAnalyzer, symbols: FileSymbols):
+        super().__init__(analyzer)
+        self.symbols = symbols
+
+    def visit_Name(self, node: ast.Name) -> None:
+        super().visit_Name(node)
+        if isinstance(node.ctx, ast.Store):
+            self.symbols.add(node.id, DEFINITION, node.lineno, node.col_offset)
+        elif isinstance(node.ctx, ast.Load):
+            self.symbols.add(node.id, USE, node.lineno, node.col_offset)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        # obj.name() считается использованием имени name
+        if isinstance(node.ctx, ast.Load):
+            self.symbols.add(node.attr, USE, node.end_lineno,
+                             node.end_col_offset - len(node.attr))
+        self.generic_visit(node)
+
+    def _visit_function(self, node) -> None:
+        self.symbols.add(node.name, DEFINITION, node.lineno, node.col_offset)
+        super()._visit_function(node)
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+
+def analyze_source(source: str, filename: str = "<unknown>",
+                   build_index: bool = False) -> Dict[str, Any]:
+    """Анализирует исходный текст одного модуля."""
+    analyzer = PythonCodeAnalyzer(build_index=build_index)
+    analyzer._analyze_ast(ast.parse(source, filename), filename)
+    return analyzer.to_dict()
+
+
+class FileResult(NamedTuple):
+    """Результат анализа одного файла, возвращаемый из процесса-исполнителя."""
+    path: str
+    result: Optional[Dict[str, Any]]
+    error: Optional[str] = None
+    mtime_ns: int = 0
+    size: int = 0
+    digest: str = ""
+
+
+def _analyze_path(task: Tuple[str, Optional[str]], build_index: bool = False) -> FileResult:
+    """Задача для пула процессов: не бросает исключений, а возвращает ошибку.
+
+    Если хэш содержимого совпал с ``known_digest``, разбор пропускается и
+    возвращается ``result=None`` — вызывающий возьмёт результат из кэша.
+    """
+    path, known_digest = task
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as file:
+            data = file.read()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if digest == known_digest:
+            return FileResult(path, None, None, stat.st_mtime_ns, stat.st_size, digest)
+        source = data.decode('utf-8')
+        return FileResult(path, analyze_source(source, path, build_index), None,
+                          stat.st_mtime_ns, stat.st_size, digest)
+    except Exception as e:
+        return FileResult(path, None, str(e))
+
+
+# Архивы, модули из которых читаются без распаковки на диск
+ARCHIVE_SUFFIXES = (".whl", ".zip", ".tar.gz", ".tgz")
+# Разделитель пути архива и имени модуля внутри него: wheel.whl!pkg/mod.py
+ARCHIVE_SEPARATOR = "!"
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+class _MappedFile(mmap.mmap):
+    """Отображение файла в память, которое ``zipfile`` примет за файл."""
+
+    def seekable(self) -> bool:
+        return True
+
+
+def iter_archive_sources(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Выдаёт имя и содержимое каждого .py модуля архива.
+
+    Zip (и wheel) читается через ``mmap``: несжатые модули берутся прямо из
+    отображённой памяти, без отдельных чтений файла. Tar.gz читается одним
+    последовательным потоком.
+    """
+    if path.lower().endswith((".tar.gz", ".tgz")):
+        import tarfile
+        with tarfile.open(path, "r|gz") as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(".py"):
+                    yield member.name, archive.extractfile(member).read()
+        return
+
+    import zipfile
+    with open(path, "rb") as file:
+        try:
+            source = _MappedFile(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            source = file  # Пустой файл или ФС без mmap
+        try:
+            with zipfile.ZipFile(source) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and info.filename.endswith(".py"):
+                        yield info.filename, archive.read(info)
+        finally:
+            if source is not file:
+                source.close()
+
+
+def _analyze_archive(path: str, build_index: bool = False) -> List[FileResult]:
+    """Задача для пула процессов: анализирует все модули одного архива.
+
+    Каждый модуль даёт свой ``FileResult`` с путём ``архив!модуль``; ошибка в
+    модуле не прерывает обход, а ошибка чтения архива возвращается как
+    результат самого архива.
+    """
+    results = []
+    try:
+        for name, data in iter_archive_sources(path):
+            member_path = f"{path}{ARCHIVE_SEPARATOR}{name}"
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            try:
+                result = analyze_source(data.decode('utf-8'), member_path, build_index)
+            except Exception as e:
+                results.append(FileResult(member_path, None, str(e)))
+                continue
+            results.append(FileResult(member_path, result, None, 0, len(data), digest))
+    except Exception as e:
+        results.append(FileResult(path, None, str(e)))
+    return results
+
+
+def collect_python_files(target: str) -> List[str]:
+    """Раскрывает файл, каталог или glob-шаблон в список .py файлов.
+
+    Архив (или шаблон вроде ``'wheels/*.whl'``) попадает в список целиком;
+    модули из него читает ``iter_analysis``.
+    """
+    if os.path.isdir(target):
+        files = []
+        for root, dirs, names in os.walk(target):
+            dirs.sort()
+            files.extend(os.path.join(root, name) for name in sorted(names)
+                         if name.endswith(".py"))
+        return files
+    if glob.has_magic(target):
+        # Шаблон вроде 'src/**' захватывает и README, и .pyc — берём только модули
+        return sorted(path for path in glob.glob(target, recursive=True)
+                      if (path.endswith(".py") or is_archive(path)) and os.path.isfile(path))
+    return [target]
+
+
+def _analyze_batch(tasks: List[Tuple[str, Optional[str]]],
+                   build_index: bool = False) -> List[FileResult]:
+    return [_analyze_path(task, build_index) for task in tasks]
+
+
+def iter_analysis(paths: Iterable[str], jobs: Optional[int] = None, chunksize: int = 64,
+                  cache: Optional["AnalysisCache"] = None,
+                  build_index: bool = False) -> Iterator[FileResult]:
+    """Анализирует файлы и выдаёт результаты по мере готовности.
+
+    Файлы, не изменившиеся с прошлого запуска, берутся из ``cache`` и
+    выдаются сразу; остальные пачками по ``chunksize`` уходят в пул процессов.
+    Каждый архив — отдельная задача, результаты выдаются по его модулям и
+    не кэшируются.
+
+    С ``build_index`` результаты несут и индекс вхождений; в кэше его нет,
+    поэтому кэш в этом режиме не используется.
+    """
+    if build_index:
+        cache = None
+    tasks = []
+    archives = []
+    cached: Dict[str, "CacheEntry"] = {}
+    for path in paths:
+        if is_archive(path):
+            archives.append(path)
+            continue
+        entry, fresh = cache.lookup(path) if cache is not None else (None, False)
+        if fresh:
+            yield FileResult(path, entry.result, None, entry.mtime_ns, entry.size, entry.digest)
+            continue
+        if entry is not None:
+            cached[path] = entry
+        tasks.append((path, entry.digest if entry is not None else None))
+
+    if jobs == 1 or len(tasks) + len(archives) <= 1:
+        for task in tasks:
+            yield _resolve_result(_analyze_path(task, build_index), cache, cached)
+        for path in archives:
+            yield from _analyze_archive(path, build_index)
+        if cache is not None:
+            cache.commit()
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    workers = jobs or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers)
+    submissions = [(_analyze_batch, tasks[i:i + chunksize])
+                   for i in range(0, len(tasks), chunksize)]
+    submissions += [(_analyze_archive, path) for path in archives]
+    submissions.reverse()
+    # В работе держится не больше двух задач на процесс: готовые результаты
+    # отдаются потребителю и отпускаются, поэтому память не растёт с числом файлов
+    pending = set()
+    archive_futures = set()
+    try:
+        while submissions or pending:
+            while submissions and len(pending) < 2 * workers:
+                function, argument = submissions.pop()
+                future = executor.submit(function, argument, build_index)
+                pending.add(future)
+                if function is _analyze_archive:
+                    archive_futures.add(future)
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results = future.result()
+                if future in archive_futures:
+                    archive_futures.discard(future)
+                    yield from results
+                    continue
+                for file_result in results:
+                    yield _resolve_result(file_result, cache, cached)
+    finally:
+        # Если потребитель прервал обход, не ждём оставшиеся пачки
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
+        if cache is not None:
+            cache.commit()
+
+
+def _resolve_result(file_result: FileResult, cache: Optional["AnalysisCache"],
+                    cached: Dict[str, "CacheEntry"]) -> FileResult:
+    if file_result.error is not None:
+        return file_result
+    if file_result.result is None:
+        # Содержимое не изменилось, поменялись только метаданные файла
+        file_result = file_result._replace(result=cached.pop(file_result.path).result)
+    if cache is not None:
+        cache.store(file_result.path, file_result.mtime_ns, file_result.size,
+                    file_result.digest, file_result.result)
+    return file_result
+
+
+def merge_file_result(analyzer: PythonCodeAnalyzer, file_result: FileResult) -> None:
+    if file_result.error is not None:
+        # Файл, который перестал разбираться, больше ничего не определяет
+        analyzer.remove_file(file_result.path)
+        analyzer.errors[file_result.path] = file_result.error
+    else:
+        analyzer.merge(file_result.result, file_result.path)
+
+
+def analyze_project(paths: Iterable[str], analyzer: PythonCodeAnalyzer,
+                    jobs: Optional[int] = None, chunksize: int = 64,
+                    cache: Optional["AnalysisCache"] = None) -> None:
+    """Анализирует набор файлов и сливает результаты в ``analyzer``.
+
+    Ошибочные файлы не прерывают анализ, а попадают в ``analyzer.errors``.
+    Индекс вхождений строится, если он есть у ``analyzer``.
+    """
+    for file_result in iter_analysis(paths, jobs, chunksize, cache,
+                                     build_index=analyzer.index is not None):
+        merge_file_result(analyzer, file_result)
+
+
+OUTPUT_FORMATS = ("json", "ndjson", "csv")
+
+
+def write_report(output_format: str, results: Iterable[FileResult], stream: TextIO) -> PythonCodeAnalyzer:
+    """Выводит результаты в машиночитаемом формате без интерфейса.
+
+    ``ndjson`` и ``csv`` пишутся построчно по мере поступления результатов и
+    не накапливают имена в памяти; ``json`` выводит один сводный отчёт.
+    Возвращает анализатор со счётчиками файлов и ошибок.
+    """
+    analyzer = PythonCodeAnalyzer()
+    if output_format == "json":
+        for file_result in results:
+            merge_file_result(analyzer, file_result)
+        report = {"files": analyzer.files_analyzed, "errors": analyzer.errors}
+        report.update((category, sorted(getattr(analyzer, category))) for category in CATEGORIES)
+        json.dump(report, stream, ensure_ascii=False, indent=2)
+        stream.write("\n")
+        return analyzer
+
+    writer = csv.writer(stream) if output_format == "csv" else None
+    if writer is not None:
+        writer.writerow(("path", "category", "name"))
+    for file_result in results:
+        if file_result.error is not None:
+            analyzer.errors[file_result.path] = file_result.error
+            record = {"path": file_result.path, "error": file_result.error}
+        else:
+            analyzer.files_analyzed += 1
+            record = {"path": file_result.path}
+            record.update((category, file_result.result[category]) for category in CATEGORIES)
+        if writer is None:
+            stream.write(json.dumps(record, ensure_ascii=False))
+            stream.write("\n")
+        elif file_result.error is not None:
+            writer.writerow((file_result.path, "error", file_result.error))
+        else:
+            for category in CATEGORIES:
+                for name in file_result.result[category]:
+                    writer.writerow((file_result.path, category, name))
+    return analyzer
+
+
+def positive_int(value: str) -> int:
+    """Тип аргумента argparse: целое число больше нуля."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"ожидается целое число больше нуля: {value!r}")
+    return number
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Анализ Python кода: файл, каталог, glob-шаблон или архив пакета.")
+    parser.add_argument("input", help="входной файл, каталог, шаблон (например 'src/**/*.py') "
+                                      "или архив .whl/.zip/.tar.gz")
+    parser.add_argument("-j", "--jobs", type=positive_int, default=None,
+                        help="число процессов (по умолчанию — по числу ядер)")
+    parser.add_argument("--chunksize", type=positive_int, default=64,
+                        help="число файлов в одной задаче пула")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--live", action="store_true",
+                      help="сразу открыть отчёт и дополнять его по мере анализа")
+    mode.add_argument("--format", choices=OUTPUT_FORMATS,
+                      help="вывести результат в stdout в указанном формате без интерфейса")
+    parser.add_argument("--watch", action="store_true",
+                        help="открыть отчёт и обновлять его при изменении файлов")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="не использовать кэш результатов")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="очистить кэш перед анализом")
+    parser.add_argument("--cache-file", default=None,
+                        help="путь к файлу кэша (по умолчанию .analyzer_cache.sqlite)")
+    return parser.parse_args(argv)
 
-    def compose(self) -> ComposeResult:
-        yield Header()
-        yield Container(
-            Static("=== Отчет по анализу Python кода ==="),
-            Static(f"Переменные: {len(self.analyzer.variables)}"),
-            ListView(*[ListItem(Static(item)) for item in sorted(self.analyzer.variables)]),
-            Static(f"Константы: {len(self.analyzer.constants)}"),
-            ListView(*[ListItem(Static(item)) for item in sorted(self.analyzer.constants)]),
-            Static(f"Системные процедуры: {len(self.analyzer.system_procedures)}"),
-            ListView(*[ListItem(Static(item)) for item in sorted(self.analyzer.system_procedures)]),
-            Static(f"Системные функции: {len(self.analyzer.system_functions)}"),
-            ListView(*[ListItem(Static(item)) for item in sorted(self.analyzer.system_functions)]),
-            Static(f"Пользовательские процедуры: {len(self.analyzer.user_procedures)}"), 
-            ListView(*[ListItem(Static(item)) for item in sorted(self.analyzer.user_procedures)]),
-            Static(f"Пользовательские функции: {len(self.analyzer.user_functions)}"),
-            ListView(*[ListItem(Static(item)) for item in sorted(self.analyzer.user_functions)]),
-        )
-        yield Footer()
 
 def main():
-    if len(sys.argv) != 2:
-        print("Использование: python analyzer.py <входной_файл>")
+    args = parse_args()
+    if args.watch and args.format is not None:
+        print("--watch нельзя совмещать с --format", file=sys.stderr)
+        sys.exit(2)
+
+    cache = None
+    if not args.no_cache:
+        from analyzer_cache import DEFAULT_CACHE_PATH, AnalysisCache
+        cache = AnalysisCache(args.cache_file or DEFAULT_CACHE_PATH)
+        if args.clear_cache:
+            cache.clear()
+
+    if args.live or args.watch:
+        # Textual загружается только когда нужен интерфейс
+        from analyzer_tui import AnalyzerApp
+        analyzer = PythonCodeAnalyzer(track_files=args.watch, track_changes=True)
+        app = AnalyzerApp(analyzer, live_input=args.input, jobs=args.jobs,
+                          chunksize=args.chunksize, cache=cache, watch=args.watch)
+        try:
+            app.run()
+        finally:
+            if cache is not None:
+                cache.close()
+        for path, error in analyzer.errors.items():
+            print(f"Ошибка при анализе файла {path}: {error}", file=sys.stderr)
+        return
+
+    paths = collect_python_files(args.input)
+    if not paths:
+        print(f"Не найдено Python файлов: {args.input}", file=sys.stderr)
         sys.exit(1)
-    
-    input_file = sys.argv[1]
-    analyzer = PythonCodeAnalyzer()
-    analyzer.analyze_file(input_file)
-    
+
+    results = iter_analysis(paths, jobs=args.jobs, chunksize=args.chunksize, cache=cache)
+    try:
+        if args.format is not None:
+            analyzer = write_report(args.format, results, sys.stdout)
+        else:
+            analyzer = PythonCodeAnalyzer()
+            for file_result in results:
+                merge_file_result(analyzer, file_result)
+    finally:
+        results.close()
+        if cache is not None:
+            cache.close()
+
+    if args.format is not None:
+        if not analyzer.files_analyzed:
+            sys.exit(1)
+        return
+
+    for path, error in analyzer.errors.items():
+        print(f"Ошибка при анализе файла {path}: {error}", file=sys.stderr)
+    if not analyzer.files_analyzed:
+        sys.exit(1)
+
+    from analyzer_tui import AnalyzerApp
     app = AnalyzerApp(analyzer)
     app.run()
 
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_PATH = ".analyzer_cache.sqlite"
+# Увеличивается при изменении формата результата; старый кэш сбрасывается
+CACHE_VERSION = 3
+# Сколько записей копится в одной транзакции: пока она открыта, другие
+# запуски анализатора (например, параллельные pre-commit хуки) ждут
+COMMIT_EVERY = 200
+# Сколько секунд ждать чужую транзакцию, прежде чем отказаться от кэша
+BUSY_TIMEOUT = 5.0
+
+
+class CacheEntry:
+    def __init__(self, mtime_ns: int, size: int, digest: str, result: Dict[str, Any]):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+        self.result = result
+
+
+class AnalysisCache:
+    """Постоянный кэш результатов анализа по файлам.
+
+    Запись считается актуальной, если совпадают mtime и размер файла; если
+    они изменились, а хэш содержимого нет, файл не разбирается повторно.
+    Старые записи вытесняются по LRU при превышении лимитов.
+
+    Записи фиксируются короткими транзакциями, а база работает в режиме WAL,
+    поэтому несколько анализаторов могут пользоваться одним кэшем. Если база
+    всё же занята дольше ``BUSY_TIMEOUT`` или повреждена, кэш отключается и
+    анализ продолжается без него.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH,
+                 max_entries: int = 100_000, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.pending = 0
+        # Кэш может использоваться из фонового потока интерфейса
+        self.connection: Optional[sqlite3.Connection] = None
+        try:
+            self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT,
+                                              check_same_thread=False)
+            self._open()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def _open(self) -> None:
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_VERSION:
+            self.connection.execute("DROP TABLE IF EXISTS entries")
+            self.connection.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " path TEXT PRIMARY KEY,"
+            " mtime_ns INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " nbytes INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.connection.commit()
+
+    def _disable(self, error: sqlite3.Error) -> None:
+        """Отключает кэш: дальнейший анализ идёт без него."""
+        print(f"Кэш {self.path} недоступен ({error}), анализ без кэша", file=sys.stderr)
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        try:
+            connection.rollback()
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+    def lookup(self, path: str) -> Tuple[Optional[CacheEntry], bool]:
+        """Возвращает запись для файла и признак того, что файл не менялся."""
+        if self.connection is None:
+            return None, False
+        try:
+            row = self.connection.execute(
+                "SELECT mtime_ns, size, digest, result FROM entries WHERE path = ?",
+                (path,)).fetchone()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return None, False
+        if row is None:
+            self.misses += 1
+            return None, False
+        entry = CacheEntry(row[0], row[1], row[2], json.loads(row[3]))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.misses += 1
+            return entry, False
+        fresh = stat.st_mtime_ns == entry.mtime_ns and stat.st_size == entry.size
+        if fresh:
+            self.hits += 1
+            self._touch(path)
+        else:
+            self.misses += 1
+        return entry, fresh
+
+    def store(self, path: str, mtime_ns: int, size: int, digest: str,
+              result: Dict[str, Any]) -> None:
+        data = json.dumps(result, separators=(",", ":"))
+        self._write("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, mtime_ns, size, digest, data, len(data), time.time()))
+
+    def _touch(self, path: str) -> None:
+        self._write("UPDATE entries SET last_used = ? WHERE path = ?", (time.time(), path))
+
+    def _write(self, sql: str, parameters: Tuple) -> None:
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute(sql, parameters)
+            self.pending += 1
+            if self.pending >= COMMIT_EVERY:
+                self.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def commit(self) -> None:
+        """Фиксирует накопленные записи и освобождает базу для других процессов."""
+        if self.connection is None:
+            return
+        try:
+            self.connection.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+        self.pending = 0
+
+    def prune(self) -> None:
+        """Удаляет давно не использованные записи сверх лимитов."""
+        if self.connection is None:
+            return
+        try:
+            self._prune()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def _prune(self) -> None:
+        count, total = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evict = []
+        for path, nbytes in self.connection.execute(
+                "SELECT path, nbytes FROM entries ORDER BY last_used"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evict.append((path,))
+            count -= 1
+            total -= nbytes
+        self.connection.executemany("DELETE FROM entries WHERE path = ?", evict)
+
+    def clear(self) -> None:
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute("DELETE FROM entries")
+            self.connection.commit()
+            self.connection.execute("VACUUM")
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def close(self) -> None:
+        self.prune()
+        self.commit()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
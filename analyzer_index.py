@@ -0,0 +1,176 @@
+import heapq
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Виды вхождений имени
+DEFINITION = 0
+USE = 1
+
+
+class Location(NamedTuple):
+    path: str
+    line: int
+    column: int
+
+
+class FileSymbols:
+    """Вхождения имён одного файла.
+
+    Имена нумеруются в пределах файла, вхождения лежат в одном массиве
+    четвёрками (номер имени, вид, строка, столбец), а число определений и
+    использований каждого имени считается по ходу обхода. Поэтому между
+    процессами файл передаётся несколькими блоками байтов, а добавление в
+    общий индекс стоит O(числа разных имён файла), а не числа вхождений.
+    """
+
+    __slots__ = ("path", "names", "definitions", "uses", "occurrences", "_ids")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.names: List[str] = []
+        self.definitions = array('I')
+        self.uses = array('I')
+        self.occurrences = array('I')
+        # Номера имён нужны только пока файл обходится
+        self._ids: Optional[Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.occurrences) // 4
+
+    def add(self, name: str, kind: int, line: int, column: int) -> None:
+        local_id = self._ids.get(name)
+        if local_id is None:
+            local_id = self._ids[name] = len(self.names)
+            self.names.append(name)
+            self.definitions.append(0)
+            self.uses.append(0)
+        self.occurrences.extend((local_id, kind, line, column))
+        if kind == DEFINITION:
+            self.definitions[local_id] += 1
+        else:
+            self.uses[local_id] += 1
+
+    def locations(self, name: str, kind: int) -> List[Location]:
+        try:
+            local_id = self.names.index(name)
+        except ValueError:
+            return []
+        occurrences = self.occurrences
+        return [Location(self.path, occurrences[i + 2], occurrences[i + 3])
+                for i in range(0, len(occurrences), 4)
+                if occurrences[i] == local_id and occurrences[i + 1] == kind]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"path": self.path, "names": self.names,
+                "definitions": self.definitions.tobytes(), "uses": self.uses.tobytes(),
+                "occurrences": self.occurrences.tobytes()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FileSymbols":
+        symbols = cls(data["path"])
+        symbols.names = list(data["names"])
+        symbols.definitions.frombytes(data["definitions"])
+        symbols.uses.frombytes(data["uses"])
+        symbols.occurrences.frombytes(data["occurrences"])
+        symbols._ids = None
+        return symbols
+
+
+class SymbolIndex:
+    """Индекс вхождений имён: где имя определено и где используется.
+
+    Имена хранятся один раз (интернированные строки) вместе с общими
+    счётчиками определений и использований, а вхождения — блоками
+    ``FileSymbols`` по файлам. Индекс строится по именам, без разрешения
+    областей видимости: обращение ``self.run()`` считается использованием
+    любой функции ``run``.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self.definition_counts = array('I')
+        self.use_counts = array('I')
+        self.files: Dict[str, FileSymbols] = {}
+        # По каждому имени: файлы, где оно встречается (словарь как
+        # упорядоченное множество)
+        self._symbol_files: List[Dict[str, None]] = []
+
+    def __len__(self) -> int:
+        return sum(map(len, self.files.values()))
+
+    def _symbol_id(self, name: str) -> int:
+        symbol_id = self._symbol_ids.get(name)
+        if symbol_id is None:
+            name = sys.intern(name)
+            symbol_id = self._symbol_ids[name] = len(self.names)
+            self.names.append(name)
+            self.definition_counts.append(0)
+            self.use_counts.append(0)
+            self._symbol_files.append({})
+        return symbol_id
+
+    def add_file(self, symbols: FileSymbols) -> None:
+        """Добавляет вхождения файла, заменяя прежние вхождения того же пути."""
+        self.remove_file(symbols.path)
+        names = []
+        for local_id, name in enumerate(symbols.names):
+            symbol_id = self._symbol_id(name)
+            names.append(self.names[symbol_id])
+            self.definition_counts[symbol_id] += symbols.definitions[local_id]
+            self.use_counts[symbol_id] += symbols.uses[local_id]
+            self._symbol_files[symbol_id][symbols.path] = None
+        # Файл ссылается на общие интернированные строки, а не на свои копии
+        symbols.names = names
+        symbols._ids = None
+        self.files[symbols.path] = symbols
+
+    def remove_file(self, path: str) -> None:
+        """Убирает из индекса все вхождения файла ``path``."""
+        symbols = self.files.pop(path, None)
+        if symbols is None:
+            return
+        for local_id, name in enumerate(symbols.names):
+            symbol_id = self._symbol_ids[name]
+            self.definition_counts[symbol_id] -= symbols.definitions[local_id]
+            self.use_counts[symbol_id] -= symbols.uses[local_id]
+            del self._symbol_files[symbol_id][path]
+
+    def locations(self, name: str, kind: int) -> List[Location]:
+        symbol_id = self._symbol_ids.get(name)
+        if symbol_id is None:
+            return []
+        locations = []
+        for path in self._symbol_files[symbol_id]:
+            locations += self.files[path].locations(name, kind)
+        return locations
+
+    def definitions(self, name: str) -> List[Location]:
+        return self.locations(name, DEFINITION)
+
+    def uses(self, name: str) -> List[Location]:
+        return self.locations(name, USE)
+
+    def use_count(self, name: str) -> int:
+        symbol_id = self._symbol_ids.get(name)
+        return 0 if symbol_id is None else self.use_counts[symbol_id]
+
+    def most_used(self, names: Iterable[str], n: int = 10) -> List[Tuple[str, int]]:
+        """N самых используемых имён из ``names`` (например, user_functions)."""
+        return heapq.nlargest(n, ((name, self.use_count(name)) for name in names),
+                              key=lambda item: item[1])
+
+    def unused(self, names: Iterable[str]) -> List[str]:
+        """Имена из ``names``, которые нигде не используются."""
+        return sorted(name for name in names if not self.use_count(name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Компактное представление для передачи между процессами (не JSON:
+        вхождения упакованы в байты)."""
+        return {"files": [symbols.to_dict() for symbols in self.files.values()]}
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """Добавляет индекс, полученный из ``to_dict`` другого экземпляра."""
+        for file_data in data["files"]:
+            self.add_file(FileSymbols.from_dict(file_data))
@@ -0,0 +1,289 @@
+import time
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Set, Tuple
+
+from rich.segment import Segment
+from textual.app import App, ComposeResult
+from textual.containers import VerticalScroll
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Collapsible, Footer, Header, Input, ProgressBar, Static
+from textual.worker import get_current_worker
+
+from analyzer import (ARCHIVE_SEPARATOR, FileResult, PythonCodeAnalyzer, collect_python_files,
+                      is_archive, iter_analysis, merge_file_result)
+from analyzer_cache import AnalysisCache
+from analyzer_watch import FileWatcher
+
+# Разделы отчёта в порядке вывода
+REPORT_SECTIONS = (
+    ("variables", "Переменные"),
+    ("constants", "Константы"),
+    ("system_procedures", "Системные процедуры"),
+    ("system_functions", "Системные функции"),
+    ("user_procedures", "Пользовательские процедуры"),
+    ("user_functions", "Пользовательские функции"),
+)
+
+
+class SymbolList(ScrollView):
+    """Виртуализированный список имён.
+
+    Вместо виджета на каждую строку рисует только видимые строки через
+    ``render_line``, поэтому стоимость не зависит от числа имён.
+    """
+
+    def __init__(self, names: List[str], **kwargs):
+        super().__init__(**kwargs)
+        self._names = names
+        self._visible = names
+        self._query = ""
+        self._update_virtual_size()
+
+    @property
+    def visible_count(self) -> int:
+        return len(self._visible)
+
+    @property
+    def total_count(self) -> int:
+        return len(self._names)
+
+    def set_filter(self, query: str) -> None:
+        """Оставляет имена, содержащие ``query``.
+
+        Если новый запрос продолжает предыдущий, фильтруется уже
+        отфильтрованный список, а не все имена.
+        """
+        if query == self._query:
+            return
+        source = self._visible if query.startswith(self._query) else self._names
+        self._apply_filter(query, source)
+        self.scroll_to(0, 0, animate=False)
+
+    def update_names(self, added: Set[str], removed: Set[str]) -> None:
+        """Вносит изменения в отсортированный список, не пересортировывая его.
+
+        Новые имена сортируются отдельно и дописываются в конец: сортировка
+        Python находит два упорядоченных отрезка и сливает их «галопом», так
+        что число сравнений зависит от размера пачки, а не от числа всех
+        имён. Фильтр и прокрутка сохраняются.
+        """
+        _remove_sorted(self._names, removed)
+        _insert_sorted(self._names, added)
+        if self._visible is not self._names:
+            query = self._query
+            _remove_sorted(self._visible, (name for name in removed if query in name))
+            _insert_sorted(self._visible, (name for name in added if query in name))
+        # Ширина только растёт: пересчёт по всем именам обошёлся бы в проход по списку
+        width = max(self.virtual_size.width, max(map(len, added), default=0))
+        self.virtual_size = Size(width, len(self._visible))
+        self.refresh()
+
+    def _apply_filter(self, query: str, source: List[str]) -> None:
+        self._visible = [name for name in source if query in name] if query else self._names
+        self._query = query
+        self._update_virtual_size()
+        self.refresh()
+
+    def _update_virtual_size(self) -> None:
+        width = max(map(len, self._visible), default=0)
+        self.virtual_size = Size(width, len(self._visible))
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = y + scroll_y
+        width = self.size.width
+        if index >= len(self._visible):
+            return Strip.blank(width, self.rich_style)
+        strip = Strip([Segment(self._visible[index], self.rich_style)])
+        return strip.crop_extend(scroll_x, scroll_x + width, self.rich_style)
+
+
+def _insert_sorted(names: List[str], added: Iterable[str]) -> None:
+    added = sorted(added)
+    if added:
+        names.extend(added)
+        names.sort()
+
+
+def _remove_sorted(names: List[str], removed: Iterable[str]) -> None:
+    for name in removed:
+        index = bisect_left(names, name)
+        if index < len(names) and names[index] == name:
+            del names[index]
+
+
+class AnalyzerApp(App):
+    CSS_PATH = "analyzer.css"  # Можно настроить внешний вид через CSS
+
+    # Как часто (в секундах) фоновый анализ передаёт результаты в интерфейс
+    UPDATE_INTERVAL = 0.1
+
+    def __init__(self, analyzer: PythonCodeAnalyzer, live_input: Optional[str] = None,
+                 jobs: Optional[int] = None, chunksize: int = 64,
+                 cache: Optional[AnalysisCache] = None, watch: bool = False):
+        """``live_input`` включает потоковый режим: анализ идёт в фоне,
+        а отчёт обновляется по мере поступления результатов.
+
+        С ``watch`` после первого анализа приложение следит за файлами и
+        заново разбирает только изменённые; анализатор должен быть создан
+        с ``track_files=True``. В обоих режимах анализатору нужен
+        ``track_changes=True``: списки обновляются по его изменениям."""
+        super().__init__()
+        self.analyzer = analyzer
+        self.query_text = ""
+        self.live_input = live_input
+        self.jobs = jobs
+        self.chunksize = chunksize
+        self.cache = cache
+        self.watch = watch
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        # Обработано входных путей: архив считается одним файлом, как и в
+        # полосе прогресса, хотя даёт результат на каждый модуль
+        self.inputs_done = 0
+        # Последнее обновление в режиме наблюдения: (файлов, секунд)
+        self.last_refresh: Optional[Tuple[int, float]] = None
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Input(placeholder="Фильтр по имени...", id="filter")
+        with VerticalScroll(id="report"):
+            yield Static("=== Отчет по анализу Python кода ===")
+            yield Static(self._summary(), id="summary")
+            if self.live_input is not None:
+                yield ProgressBar(show_eta=False, id="progress")
+            # Списки создаются только при раскрытии раздела
+            for category, label in REPORT_SECTIONS:
+                yield Collapsible(title=self._section_title(category), id=f"section-{category}")
+        yield Footer()
+
+    def on_mount(self) -> None:
+        if self.live_input is not None:
+            self.started_at = time.monotonic()
+            self.run_worker(self._stream_analysis, thread=True, exclusive=True)
+
+    def _summary(self) -> str:
+        summary = f"Файлов: {self.analyzer.files_analyzed}, ошибок: {len(self.analyzer.errors)}"
+        if self.started_at:
+            elapsed = max((self.finished_at or time.monotonic()) - self.started_at, 1e-9)
+            summary += f", {self.inputs_done / elapsed:.0f} файлов/с"
+        if self.last_refresh is not None:
+            count, seconds = self.last_refresh
+            summary += f"; обновлено файлов: {count} за {seconds * 1000:.1f} мс"
+        return summary
+
+    def _section_title(self, category: str, shown: Optional[int] = None) -> str:
+        label = dict(REPORT_SECTIONS)[category]
+        total = len(getattr(self.analyzer, category))
+        if shown is None or shown == total:
+            return f"{label}: {total}"
+        return f"{label}: {shown} из {total}"
+
+    def _stream_analysis(self) -> None:
+        """Фоновый поток: анализирует файлы и пачками передаёт результаты в UI."""
+        worker = get_current_worker()
+        # Снимок для наблюдения делается до анализа, чтобы не пропустить
+        # файлы, сохранённые во время первого прохода
+        watcher = FileWatcher(self.live_input) if self.watch else None
+        paths = list(watcher.snapshot) if watcher is not None else collect_python_files(self.live_input)
+        self.call_from_thread(self.query_one("#progress", ProgressBar).update, total=len(paths))
+        results = iter_analysis(paths, self.jobs, self.chunksize, self.cache)
+        inputs = set(paths)
+        archive_prefixes = [path + ARCHIVE_SEPARATOR for path in paths if is_archive(path)]
+        batch: List[FileResult] = []
+        last_input = None
+        inputs_done = 0
+        last_update = 0.0
+        try:
+            for file_result in results:
+                if worker.is_cancelled:
+                    return
+                batch.append(file_result)
+                # Результаты одного входа (модули архива и его ошибка) идут
+                # подряд, поэтому вход засчитывается, когда пришёл первый из них
+                path = file_result.path
+                if path not in inputs:
+                    path = next(prefix for prefix in archive_prefixes
+                                if path.startswith(prefix))[:-len(ARCHIVE_SEPARATOR)]
+                if path != last_input:
+                    last_input = path
+                    inputs_done += 1
+                now = time.monotonic()
+                if now - last_update >= self.UPDATE_INTERVAL:
+                    self.call_from_thread(self._apply_results, batch, inputs_done)
+                    batch = []
+                    last_update = now
+        finally:
+            results.close()
+        self.finished_at = time.monotonic()
+        # Пустые архивы результатов не дают, но тоже обработаны
+        self.call_from_thread(self._apply_results, batch, len(paths))
+
+        if watcher is None:
+            return
+        for changes in watcher.watch(lambda: worker.is_cancelled):
+            started = time.perf_counter()
+            # Изменённых файлов обычно единицы: пул процессов не нужен
+            changed = list(iter_analysis(changes.changed, jobs=1, cache=self.cache))
+            changed_archives = [path for path in changes.changed if is_archive(path)]
+            self.call_from_thread(self._apply_changes, changed, changed_archives,
+                                  changes.removed, started)
+
+    def _apply_results(self, batch: List[FileResult], inputs_done: int) -> None:
+        for file_result in batch:
+            merge_file_result(self.analyzer, file_result)
+        self.inputs_done = inputs_done
+        self.query_one("#progress", ProgressBar).update(progress=inputs_done)
+        self._refresh_report()
+
+    def _apply_changes(self, changed: List[FileResult], changed_archives: List[str],
+                       removed: List[str], started: float) -> None:
+        """Заменяет вклад изменённых файлов и убирает удалённые."""
+        for path in removed:
+            if is_archive(path):
+                self.analyzer.remove_archive(path)
+            else:
+                self.analyzer.remove_file(path)
+        for path in changed_archives:
+            # Модули, исчезнувшие из архива, не придут в новых результатах
+            self.analyzer.remove_archive(path)
+        for file_result in changed:
+            merge_file_result(self.analyzer, file_result)
+        self._refresh_report()
+        self.last_refresh = (len(changed) + len(removed), time.perf_counter() - started)
+        self.query_one("#summary", Static).update(self._summary())
+
+    def _refresh_report(self) -> None:
+        """Обновляет сводку и вносит появившиеся и исчезнувшие имена в раскрытые списки."""
+        self.query_one("#summary", Static).update(self._summary())
+        changes = self.analyzer.take_changes()
+        for category, (added, removed) in changes.items():
+            collapsible = self.query_one(f"#section-{category}", Collapsible)
+            shown = None
+            for symbols in collapsible.query(SymbolList):
+                symbols.update_names(added, removed)
+                shown = symbols.visible_count
+            collapsible.title = self._section_title(category, shown)
+
+    def on_collapsible_expanded(self, event: Collapsible.Expanded) -> None:
+        collapsible = event.collapsible
+        if collapsible.query(SymbolList):
+            return
+        category = collapsible.id[len("section-"):]
+        symbols = SymbolList(sorted(getattr(self.analyzer, category)))
+        collapsible.query_one(Collapsible.Contents).mount(symbols)
+        if self.query_text:
+            symbols.set_filter(self.query_text)
+            collapsible.title = self._section_title(category, symbols.visible_count)
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        self.query_text = event.value
+        for category, _ in REPORT_SECTIONS:
+            collapsible = self.query_one(f"#section-{category}", Collapsible)
+            shown = None
+            for symbols in collapsible.query(SymbolList):
+                symbols.set_filter(self.query_text)
+                shown = symbols.visible_count
+            collapsible.title = self._section_title(category, shown)
@@ -0,0 +1,82 @@
+import os
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from analyzer import collect_python_files
+
+# Метаданные файла, по которым замечается изменение
+Stamp = Tuple[int, int]
+
+
+class Changes(NamedTuple):
+    changed: List[str]
+    removed: List[str]
+
+
+class FileWatcher:
+    """Опрос файлов анализа с подавлением дребезга.
+
+    Каждые ``interval`` секунд сравнивает время изменения и размер всех
+    файлов цели (файла, каталога или шаблона) с предыдущим снимком. Изменения
+    копятся, пока файлы не перестанут меняться на ``debounce`` секунд:
+    редактор часто сохраняет файл в несколько записей, и разбирать каждую
+    промежуточную версию незачем.
+
+    На больших деревьях интервал растёт вместе со временем обхода, чтобы
+    опрос занимал не больше ``1 / SCAN_BUDGET`` процессорного времени.
+    """
+
+    SCAN_BUDGET = 10
+
+    def __init__(self, target: str, interval: float = 0.2, debounce: float = 0.1):
+        self.target = target
+        self.interval = interval
+        self.debounce = debounce
+        self.snapshot = self.scan()
+
+    def scan(self) -> Dict[str, Stamp]:
+        snapshot = {}
+        for path in collect_python_files(self.target):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Файл удалён между обходом каталога и stat
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> Changes:
+        """Изменения с прошлого опроса."""
+        snapshot = self.scan()
+        previous = self.snapshot
+        changed = [path for path, stamp in snapshot.items() if previous.get(path) != stamp]
+        removed = [path for path in previous if path not in snapshot]
+        self.snapshot = snapshot
+        return Changes(changed, removed)
+
+    def watch(self, should_stop: Callable[[], bool]) -> Iterator[Changes]:
+        """Выдаёт накопленные изменения, пока ``should_stop`` не вернёт True."""
+        changed: Dict[str, None] = {}
+        removed: Dict[str, None] = {}
+        last_change = 0.0
+        scan_time = 0.0
+        while not should_stop():
+            if changed or removed:
+                time.sleep(self.debounce)
+            else:
+                time.sleep(max(self.interval, scan_time * self.SCAN_BUDGET))
+            started = time.monotonic()
+            changes = self.poll()
+            now = time.monotonic()
+            scan_time = now - started
+            if changes.changed or changes.removed:
+                for path in changes.changed:
+                    removed.pop(path, None)
+                    changed[path] = None
+                for path in changes.removed:
+                    changed.pop(path, None)
+                    removed[path] = None
+                last_change = now
+            elif (changed or removed) and now - last_change >= self.debounce:
+                yield Changes(list(changed), list(removed))
+                changed.clear()
+                removed.clear()
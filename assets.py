@@ -0,0 +1,136 @@
+"""Звуки тренажёра: фоновая загрузка, кэш декодированного звука и каналы.
+
+Декодирование MP3 — самая долгая часть запуска, поэтому звуки грузятся в
+фоновом потоке, а меню показывается сразу. Декодированный PCM сохраняется
+на диск (ключ — хеш исходного файла и формат микшера), и при следующих
+запусках MP3 не декодируется. Каждому звуку выделен свой пул каналов
+микшера, чтобы частые звуки не вытесняли друг друга.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import pygame
+
+SOUND_FILES = {
+    "correct": "sounds/correct.mp3",
+    "wrong": "sounds/incorrect.mp3",
+    "level_up": "sounds/new_level.mp3"
+}
+
+# Сколько каналов микшера закреплено за каждым звуком
+SOUND_CHANNELS = {
+    "correct": 4,
+    "wrong": 2,
+    "level_up": 1
+}
+
+DEFAULT_SOUND_CACHE_DIR = ".sound_cache"
+
+
+def decoded_cache_path(source, cache_dir):
+    """Путь к декодированному звуку для содержимого ``source``."""
+    digest = hashlib.blake2b(digest_size=16)
+    # Сырые отсчёты зависят от частоты, формата и числа каналов микшера
+    digest.update(repr(pygame.mixer.get_init()).encode())
+    digest.update(source)
+    return os.path.join(cache_dir, digest.hexdigest() + ".pcm")
+
+
+def load_sound(path, cache_dir=DEFAULT_SOUND_CACHE_DIR):
+    """Загружает звук, по возможности из кэша декодированного PCM."""
+    with open(path, "rb") as f:
+        source = f.read()
+    cache_path = decoded_cache_path(source, cache_dir)
+    try:
+        with open(cache_path, "rb") as f:
+            return pygame.mixer.Sound(buffer=f.read())
+    except OSError:
+        pass
+
+    sound = pygame.mixer.Sound(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Запись через временный файл: оборванная запись не попадёт в кэш
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(sound.get_raw())
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # Без кэша звук просто будет декодирован и в следующий раз
+    return sound
+
+
+class ChannelPool:
+    """Закреплённые за звуком каналы микшера.
+
+    Звук играет на свободном канале пула; если все заняты, прерывается
+    самый давний, а не случайный чужой звук.
+    """
+
+    def __init__(self, channel_ids):
+        self.channels = [pygame.mixer.Channel(i) for i in channel_ids]
+        self.next = 0
+
+    def play(self, sound):
+        count = len(self.channels)
+        for i in range(count):
+            index = (self.next + i) % count
+            if not self.channels[index].get_busy():
+                break
+        else:
+            index = self.next
+        self.next = (index + 1) % count
+        self.channels[index].play(sound)
+
+
+class SoundBank:
+    """Звуки игры, загружаемые в фоновом потоке.
+
+    Пока звук не загружен, ``play`` ничего не делает.
+    """
+
+    def __init__(self, files=SOUND_FILES, channels=SOUND_CHANNELS,
+                 cache_dir=DEFAULT_SOUND_CACHE_DIR):
+        self.files = files
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.pools = {}
+        self.load_time = None
+        self.ready = threading.Event()
+
+        if not pygame.mixer.get_init():
+            self.ready.set()
+            return
+
+        # Закреплённые каналы не занимаются звуками, запущенными через Sound.play
+        reserved = sum(channels[name] for name in files)
+        if pygame.mixer.get_num_channels() < reserved:
+            pygame.mixer.set_num_channels(reserved)
+        pygame.mixer.set_reserved(reserved)
+        first = 0
+        for name in files:
+            self.pools[name] = ChannelPool(range(first, first + channels[name]))
+            first += channels[name]
+
+        threading.Thread(target=self._load, name="sound-loader", daemon=True).start()
+
+    def _load(self):
+        start = time.perf_counter()
+        for name, path in self.files.items():
+            try:
+                self.sounds[name] = load_sound(path, self.cache_dir)
+            except (OSError, pygame.error) as e:
+                print(f"Не удалось загрузить звук {path}: {e}")
+        self.load_time = time.perf_counter() - start
+        self.ready.set()
+
+    def wait(self, timeout=None):
+        """Ждёт окончания загрузки; возвращает ``False`` по таймауту."""
+        return self.ready.wait(timeout)
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound is not None:
+            self.pools[name].play(sound)
@@ -0,0 +1,357 @@
+"""Бенчмарки анализатора.
+
+walk    — однопроходный обход AST против прежнего варианта (вложенный
+          ``ast.walk`` для каждой функции) на модулях разной глубины и размера;
+startup — время холодного запуска ``analyzer.py`` и самые дорогие импорты
+          по данным ``python -X importtime``;
+corpus  — синтетический проект заданного размера: время разбора, обхода AST
+          и сборки отчёта, пиковая память (tracemalloc), файлов/с и МБ/с,
+          запуск ``AnalyzerApp``. С ``--json`` результаты пишутся в файл для
+          сравнения версий анализатора.
+
+Запуск: python bench_analyzer.py [walk|startup|corpus ...] [--json ФАЙЛ]
+        python bench_analyzer.py corpus --files 2000 --functions 20 --depth 3 --names 500
+"""
+import argparse
+import ast
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from analyzer import FileResult, PythonCodeAnalyzer, collect_python_files, write_report
+
+
+def generate_nested_source(functions: int, depth: int) -> str:
+    """Модуль из ``functions`` функций, каждая вложена на глубину ``depth``."""
+    lines = []
+    for i in range(functions):
+        for d in range(depth):
+            indent = "    " * d
+            lines.append(f"{indent}def func_{i}_{d}(x):")
+            lines.append(f"{indent}    value_{d} = x + {d}")
+        lines.append("    " * depth + "return x")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_analyze(tree: ast.AST, analyzer: PythonCodeAnalyzer) -> None:
+    """Прежняя реализация _analyze_ast (квадратичная по вложенности)."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if isinstance(node.ctx, ast.Store):
+                if node.id.isupper():
+                    analyzer.constants.add(node.id)
+                else:
+                    analyzer.variables.add(node.id)
+        elif isinstance(node, ast.FunctionDef):
+            returns_value = any(isinstance(n, ast.Return) and n.value is not None
+                                for n in ast.walk(node))
+            analyzer._add_function(node.name, returns_value)
+
+
+def best_time(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_walk(functions: int, depth: int) -> None:
+    tree = ast.parse(generate_nested_source(functions, depth))
+    single = best_time(lambda: PythonCodeAnalyzer()._analyze_ast(tree))
+    legacy = best_time(lambda: legacy_analyze(tree, PythonCodeAnalyzer()))
+    print(f"{functions:>9} {depth:>8} {legacy * 1000:>12.2f} {single * 1000:>12.2f} "
+          f"{legacy / single:>8.1f}x")
+
+
+def run_walk_benchmarks() -> None:
+    print(f"{'функций':>9} {'глубина':>8} {'старый, мс':>12} {'новый, мс':>12} {'ускор.':>9}")
+    for depth in (1, 5, 10, 20, 40):
+        bench_walk(50, depth)
+    for functions in (100, 1000, 5000):
+        bench_walk(functions, 5)
+
+
+ANALYZER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analyzer.py")
+
+# Сценарии запуска: подпись и аргументы analyzer.py
+STARTUP_SCENARIOS = (
+    ("ошибка в аргументах", ["--format", "xml"]),
+    ("--help", ["--help"]),
+    ("один файл, json", [ANALYZER_PATH, "--format", "json", "--no-cache"]),
+    ("один файл, json, кэш", [ANALYZER_PATH, "--format", "json"]),
+)
+
+
+def time_command(command, repeat: int = 10) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def top_imports(args, limit: int = 10):
+    """Самые дорогие импорты (по суммарному времени) из ``-X importtime``."""
+    process = subprocess.run([sys.executable, "-X", "importtime", ANALYZER_PATH, *args],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        imports.append((int(cumulative_us), name.rstrip()))
+    return sorted(imports, reverse=True)[:limit]
+
+
+def run_startup_benchmarks() -> None:
+    baseline = time_command([sys.executable, "-c", "pass"])
+    print(f"{'пустой интерпретатор':<28} {baseline * 1000:>8.1f} мс")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_args = ["--cache-file", os.path.join(cache_dir, "cache.sqlite")]
+        for label, args in STARTUP_SCENARIOS:
+            elapsed = time_command([sys.executable, ANALYZER_PATH, *args, *cache_args])
+            print(f"{label:<28} {elapsed * 1000:>8.1f} мс")
+    print("\nСамые дорогие импорты (один файл, json):")
+    for cumulative_us, name in top_imports(STARTUP_SCENARIOS[2][1]):
+        print(f"{cumulative_us / 1000:>8.1f} мс  {name}")
+
+
+def generate_module(rng: random.Random, functions: int, depth: int, names: int) -> str:
+    """Модуль из ``functions`` функций с вложенностью ``depth``.
+
+    Идентификаторы выбираются из ``names`` различных имён, поэтому от этого
+    параметра зависит размер множеств в отчёте и индекса имён.
+    """
+    def name() -> str:
+        return f"name_{rng.randrange(names)}"
+
+    lines = [f"CONST_{rng.randrange(names)} = {rng.randrange(1000)}", ""]
+    for i in range(functions):
+        for d in range(depth):
+            indent = "    " * d
+            lines.append(f"{indent}def {name()}_{i}_{d}({name()}, {name()}):")
+            lines.append(f"{indent}    {name()} = len({name()}) + {d}")
+            lines.append(f"{indent}    {name()}.{name()}({name()})")
+        indent = "    " * depth
+        if rng.random() < 0.5:
+            lines.append(f"{indent}return {name()}")
+        else:
+            lines.append(f"{indent}print({name()})")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(root: str, files: int, functions: int, depth: int, names: int,
+                    seed: int = 0, files_per_dir: int = 100) -> int:
+    """Создаёт в ``root`` проект из ``files`` модулей; возвращает его размер в байтах."""
+    rng = random.Random(seed)
+    total = 0
+    for i in range(files):
+        directory = os.path.join(root, f"pkg_{i // files_per_dir}")
+        os.makedirs(directory, exist_ok=True)
+        data = generate_module(rng, functions, depth, names).encode("utf-8")
+        with open(os.path.join(directory, f"module_{i}.py"), "wb") as f:
+            f.write(data)
+        total += len(data)
+    return total
+
+
+def analyze_corpus(sources: Dict[str, str]) -> Dict[str, float]:
+    """Разбор, обход и сборка отчёта по уже прочитанным исходникам; время фаз в секундах.
+
+    Файлы обрабатываются по одному, как в процессах-исполнителях: дерево
+    файла освобождается до разбора следующего.
+    """
+    parse = walk = report = 0.0
+    file_results = []
+    for path, source in sources.items():
+        start = time.perf_counter()
+        tree = ast.parse(source, path)
+        parsed = time.perf_counter()
+        analyzer = PythonCodeAnalyzer()
+        analyzer._analyze_ast(tree, path)
+        walked = time.perf_counter()
+        file_results.append(FileResult(path, analyzer.to_dict()))
+        parse += parsed - start
+        walk += walked - parsed
+        report += time.perf_counter() - walked
+
+    start = time.perf_counter()
+    write_report("json", file_results, io.StringIO())
+    report += time.perf_counter() - start
+    return {"parse": parse, "walk": walk, "report": report}
+
+
+def peak_memory(sources: Dict[str, str]) -> int:
+    """Пиковая память полного анализа по данным tracemalloc, в байтах."""
+    tracemalloc.start()
+    try:
+        analyze_corpus(sources)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def tui_startup(paths: List[str]) -> Optional[float]:
+    """Время запуска ``AnalyzerApp`` с готовым отчётом и раскрытия самого большого раздела."""
+    try:
+        from analyzer_tui import AnalyzerApp, SymbolList
+    except ImportError:
+        return None  # Textual не установлен
+    from textual.widgets import Collapsible
+
+    analyzer = PythonCodeAnalyzer()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        analyzer._analyze_ast(ast.parse(source, path), path)
+        analyzer.files_analyzed += 1
+
+    async def run() -> float:
+        start = time.perf_counter()
+        app = AnalyzerApp(analyzer)
+        async with app.run_test(size=(120, 40)) as pilot:
+            app.query_one("#section-variables", Collapsible).collapsed = False
+            while not app.query(SymbolList):
+                await pilot.pause()
+            return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def bench_corpus(files: int, functions: int, depth: int, names: int, repeat: int = 3,
+                 seed: int = 0) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as root:
+        total_bytes = generate_corpus(root, files, functions, depth, names, seed)
+        paths = collect_python_files(root)
+        start = time.perf_counter()
+        sources = {}
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                sources[path] = f.read()
+        read_time = time.perf_counter() - start
+
+        # Лучшее из ``repeat`` для каждой фазы
+        timings = [analyze_corpus(sources) for _ in range(repeat)]
+        phases = {phase: min(t[phase] for t in timings) for phase in timings[0]}
+        peak = peak_memory(sources)
+        startup = tui_startup(paths)
+
+    analysis = phases["parse"] + phases["walk"]
+    return {
+        "config": {"files": files, "functions": functions, "depth": depth, "names": names,
+                   "seed": seed},
+        "bytes": total_bytes,
+        "read_ms": read_time * 1000,
+        "parse_ms": phases["parse"] * 1000,
+        "walk_ms": phases["walk"] * 1000,
+        "report_ms": phases["report"] * 1000,
+        "peak_memory_mb": peak / 2**20,
+        "files_per_s": files / analysis,
+        "mb_per_s": total_bytes / 2**20 / analysis,
+        "tui_startup_ms": startup * 1000 if startup is not None else None,
+    }
+
+
+# Сетка по умолчанию: рост числа файлов, вложенности и числа различных имён
+CORPUS_SCENARIOS = (
+    {"files": 100, "functions": 20, "depth": 2, "names": 200},
+    {"files": 400, "functions": 20, "depth": 2, "names": 200},
+    {"files": 100, "functions": 20, "depth": 8, "names": 200},
+    {"files": 100, "functions": 20, "depth": 2, "names": 20000},
+)
+
+
+def run_corpus_benchmarks(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    custom = {key: getattr(args, key) for key in ("files", "functions", "depth", "names")
+              if getattr(args, key) is not None}
+    if custom:
+        scenarios = [dict(CORPUS_SCENARIOS[0], **custom)]
+    else:
+        scenarios = CORPUS_SCENARIOS
+
+    print(f"{'файлов':>7} {'функц.':>7} {'глуб.':>6} {'имён':>7} {'разбор':>9} {'обход':>9} "
+          f"{'отчёт':>9} {'память':>9} {'файлов/с':>9} {'МБ/с':>7} {'TUI':>8}")
+    results = []
+    for scenario in scenarios:
+        result = bench_corpus(repeat=args.repeat, seed=args.seed, **scenario)
+        results.append(result)
+        startup = result["tui_startup_ms"]
+        print(f"{scenario['files']:>7} {scenario['functions']:>7} {scenario['depth']:>6} "
+              f"{scenario['names']:>7} {result['parse_ms']:>7.0f}мс {result['walk_ms']:>7.0f}мс "
+              f"{result['report_ms']:>7.0f}мс {result['peak_memory_mb']:>7.1f}МБ "
+              f"{result['files_per_s']:>9.0f} {result['mb_per_s']:>7.2f} "
+              + (f"{startup:>6.0f}мс" if startup is not None else f"{'—':>8}"))
+    return results
+
+
+BENCHMARKS = {
+    "walk": lambda args: run_walk_benchmarks(),
+    "startup": lambda args: run_startup_benchmarks(),
+    "corpus": run_corpus_benchmarks,
+}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарки анализатора")
+    parser.add_argument("benchmarks", nargs="*", metavar="{" + ",".join(BENCHMARKS) + "}",
+                        help="какие бенчмарки запустить (по умолчанию все)")
+    corpus = parser.add_argument_group("corpus", "параметры синтетического проекта "
+                                                 "(заданные заменяют сетку по умолчанию)")
+    corpus.add_argument("--files", type=int, help="число модулей")
+    corpus.add_argument("--functions", type=int, help="функций в модуле")
+    corpus.add_argument("--depth", type=int, help="вложенность функций")
+    corpus.add_argument("--names", type=int, help="число различных идентификаторов")
+    corpus.add_argument("--seed", type=int, default=0, help="зерно генератора")
+    corpus.add_argument("--repeat", type=int, default=3, help="повторов каждой фазы")
+    parser.add_argument("--json", metavar="ФАЙЛ",
+                        help="записать результаты corpus в JSON ('-' — в stdout)")
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"неизвестный бенчмарк: {name}")
+    return args
+
+
+def main():
+    args = parse_args()
+    names = args.benchmarks or list(BENCHMARKS)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+    }
+    # При выводе JSON в stdout таблицы уходят в stderr
+    table = sys.stderr if args.json == "-" else sys.stdout
+    stdout, sys.stdout = sys.stdout, table
+    try:
+        for name in names:
+            print(f"== {name} ==")
+            result = BENCHMARKS[name](args)
+            if result is not None:
+                report["results"][name] = result
+    finally:
+        sys.stdout = stdout
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Бенчмарк игрового движка тренажёра.
+
+Прогоняет ``GameEngine`` без окна со сценарным вводом (машинистка нажимает
+символ самой старой буквы с заданной частотой и иногда ошибается) и
+сообщает число шагов в секунду и перцентили времени шага для разных
+плотностей букв и уровней сложности.
+
+С ``--render`` дополнительно измеряется полный кадр ``KeyboardTrainer``
+(шаг, отрисовка, обновление экрана) под видеодрайвером SDL ``dummy``.
+С ``--startup`` измеряется запуск игры в отдельном процессе: время до
+первого кадра меню и до окончания загрузки звуков, с пустым («холодный»)
+и заполненным («тёплый») кэшем декодированного звука.
+
+Запуск: python bench_game.py [--steps N] [--render] [--startup]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from engine import DIFFICULTY_LEVELS, GameEngine
+
+DENSITIES = (10, 100, 1000, 5000)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def make_engine(difficulty, density, seed=0):
+    """Движок, заполненный ``density`` буквами по всей высоте экрана."""
+    engine = GameEngine(difficulty=difficulty, max_missed=float("inf"),
+                        rng=random.Random(seed))
+    for _ in range(density):
+        engine.spawn_letter()
+    for letter in engine.letters:
+        letter['y'] = letter['prev_y'] = engine.rng.uniform(0, engine.height)
+    return engine
+
+
+def scripted_step(engine, density, rng, keys_per_step=0.1, error_rate=0.05):
+    """Один шаг: ввод машинистки, шаг симуляции, поддержание плотности."""
+    if rng.random() < keys_per_step:
+        if rng.random() < error_rate:
+            engine.press("!")
+        else:
+            oldest = next(iter(engine.letters), None)
+            if oldest is not None:
+                engine.press(oldest['char'])
+    engine.step()
+    engine.drain_events()
+    while len(engine.letters) < density:
+        engine.spawn_letter()
+
+
+def report(label, frame_times):
+    frame_times.sort()
+    total = sum(frame_times)
+    print(f"{label:<28} {len(frame_times) / total:>10.0f} "
+          f"{percentile(frame_times, 0.5) * 1e6:>9.1f} "
+          f"{percentile(frame_times, 0.95) * 1e6:>9.1f} "
+          f"{percentile(frame_times, 0.99) * 1e6:>9.1f}")
+
+
+def print_header(unit):
+    print(f"{'сценарий':<28} {unit + '/с':>10} {'p50, мкс':>9} {'p95, мкс':>9} {'p99, мкс':>9}")
+
+
+def bench_engine(steps):
+    print_header("шагов")
+    for difficulty in DIFFICULTY_LEVELS:
+        for density in DENSITIES:
+            engine = make_engine(difficulty, density)
+            rng = random.Random(1)
+            times = []
+            for _ in range(steps):
+                start = time.perf_counter()
+                scripted_step(engine, density, rng)
+                times.append(time.perf_counter() - start)
+            report(f"{difficulty}, {density} букв", times)
+
+
+def bench_render(frames):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from game import KeyboardTrainer
+
+    # Статистика во временной базе, чтобы не трогать историю игрока
+    with tempfile.TemporaryDirectory() as stats_dir:
+        trainer = KeyboardTrainer(stats_path=os.path.join(stats_dir, "statistics.sqlite"))
+        trainer.settings["sound_enabled"] = False
+        print_header("кадров")
+        for density in DENSITIES:
+            trainer.engine = make_engine(trainer.current_difficulty, density)
+            rng = random.Random(1)
+            times = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                scripted_step(trainer.engine, density, rng)
+                trainer.update_particles()
+                trainer.present(trainer.draw_game())
+                times.append(time.perf_counter() - start)
+            report(f"кадр, {density} букв", times)
+        trainer.statistics.close()
+        pygame.quit()
+
+
+# Выполняется в отдельном процессе; печатает JSON с временами в секундах
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import pygame
+from game import KeyboardTrainer
+trainer = KeyboardTrainer(sound_cache_dir=sys.argv[1], stats_path=sys.argv[2])
+trainer.present(trainer.draw_menu())
+first_frame = time.perf_counter() - start
+trainer.sounds.wait()
+sounds_ready = time.perf_counter() - start
+trainer.statistics.close()
+pygame.quit()
+print(json.dumps({"first_frame": first_frame, "sounds_ready": sounds_ready,
+                  "sound_load": trainer.sounds.load_time or 0.0}))
+"""
+
+
+def time_startup(cache_dir, stats_path):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, cache_dir, stats_path],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def bench_startup(runs=5):
+    print(f"{'запуск':<28} {'меню, мс':>10} {'звуки, мс':>10} {'загрузка, мс':>13}")
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            tempfile.TemporaryDirectory() as stats_dir:
+        stats_path = os.path.join(stats_dir, "statistics.sqlite")
+        # Холодный запуск: каждый раз с пустым кэшем
+        cold = []
+        for _ in range(runs):
+            for name in os.listdir(cache_dir):
+                os.remove(os.path.join(cache_dir, name))
+            cold.append(time_startup(cache_dir, stats_path))
+        warm = [time_startup(cache_dir, stats_path) for _ in range(runs)]
+    for label, timings in (("холодный (декодирование MP3)", cold), ("тёплый (кэш PCM)", warm)):
+        print(f"{label:<28} "
+              f"{min(t['first_frame'] for t in timings) * 1000:>10.1f} "
+              f"{min(t['sounds_ready'] for t in timings) * 1000:>10.1f} "
+              f"{min(t['sound_load'] for t in timings) * 1000:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк движка тренажёра")
+    parser.add_argument("--steps", type=int, default=2000, help="шагов на сценарий")
+    parser.add_argument("--render", action="store_true",
+                        help="также измерить полный кадр с отрисовкой")
+    parser.add_argument("--startup", action="store_true",
+                        help="также измерить холодный и тёплый запуск игры")
+    args = parser.parse_args()
+
+    bench_engine(args.steps)
+    if args.render:
+        print()
+        bench_render(args.steps // 10)
+    if args.startup:
+        print()
+        bench_startup()
+
+
+if __name__ == "__main__":
+    main()
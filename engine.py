@@ -0,0 +1,221 @@
+"""Игровая логика тренажёра без зависимости от pygame.
+
+Движок отвечает за появление и падение букв, сопоставление нажатий,
+счёт, уровни и окончание игры. Звуки, частицы и отрисовка остаются в
+``game.py``: движок лишь сообщает о произошедшем через очередь событий.
+"""
+import random
+import string
+from collections import deque
+
+from telemetry import OUTCOME_HIT, OUTCOME_MISSED, OUTCOME_WRONG_KEY, KeyTelemetry
+
+# Настройки сложности
+DIFFICULTY_LEVELS = {
+    "Легкий": {"speed": 2, "spawn_rate": 1.0, "letters": string.ascii_uppercase},
+    "Средний": {"speed": 3, "spawn_rate": 1.2, "letters": string.ascii_uppercase + string.digits},
+    "Сложный": {"speed": 5, "spawn_rate": 1.5, "letters": string.ascii_uppercase + string.digits}
+}
+
+WHITE = (255, 255, 255)
+
+# События движка: (вид, буква или None)
+HIT = "hit"
+WRONG_KEY = "wrong_key"
+MISSED = "missed"
+LEVEL_UP = "level_up"
+GAME_OVER = "game_over"
+
+
+class LetterField:
+    """Буквы на экране с индексом по символу.
+
+    Буквы лежат в слотах; освобождённый слот отмечается ``None`` и
+    переиспользуется следующей буквой, поэтому удаление — O(1) и обход не
+    требует копии списка. Для каждого символа хранится очередь букв в
+    порядке появления: поиск самой старой буквы по нажатой клавише — O(1).
+    """
+
+    def __init__(self):
+        self.slots = []
+        self.free_slots = []
+        self.by_char = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # Обход по индексу: удаление во время обхода только освобождает слот
+        slots = self.slots
+        for i in range(len(slots)):
+            letter = slots[i]
+            if letter is not None:
+                yield letter
+
+    def append(self, letter):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.slots[slot] = letter
+        else:
+            slot = len(self.slots)
+            self.slots.append(letter)
+        letter['slot'] = slot
+        self.by_char.setdefault(letter['char'], deque()).append(letter)
+        self.count += 1
+
+    def remove(self, letter):
+        slot = letter['slot']
+        self.slots[slot] = None
+        self.free_slots.append(slot)
+        letter['slot'] = None
+        self.count -= 1
+        # Из очереди символа буква удаляется лениво, когда окажется в её начале
+        self._drop_removed(self.by_char[letter['char']])
+
+    def pop_oldest(self, char):
+        """Удаляет и возвращает самую раннюю букву с символом ``char``."""
+        queue = self.by_char.get(char)
+        if not queue:
+            return None
+        letter = queue[0]
+        self.remove(letter)
+        return letter
+
+    @staticmethod
+    def _drop_removed(queue):
+        while queue and queue[0]['slot'] is None:
+            queue.popleft()
+
+
+class GameEngine:
+    """Состояние одной игры и её пошаговое обновление.
+
+    ``step`` выполняет один шаг симуляции фиксированной длины (скорости
+    заданы за шаг, ``sim_rate`` шагов в секунду), ``press`` обрабатывает
+    нажатие клавиши. Побочные эффекты накапливаются в ``events``.
+    """
+
+    def __init__(self, width=1200, height=900, difficulty="Средний",
+                 sim_rate=60, max_missed=10, rng=random):
+        self.width = width
+        self.height = height
+        self.sim_rate = sim_rate
+        self.max_missed = max_missed
+        self.rng = rng
+        self.events = []
+        # Раз в сколько шагов пересчитывается цвет букв в опасной зоне
+        self.color_update_interval = 1
+        self.telemetry = KeyTelemetry()
+        self.reset(difficulty)
+
+    def reset(self, difficulty=None):
+        if difficulty is not None:
+            self.difficulty = difficulty
+        self.letters = LetterField()
+        self.score = 0
+        self.missed = 0
+        self.base_speed = DIFFICULTY_LEVELS[self.difficulty]["speed"]
+        self.level = 1
+        self.combo = 0
+        self.max_combo = 0
+        self.spawn_timer = 0
+        # Номер шага симуляции: по нему считается время реакции
+        self.steps = 0
+        self.total_keys_pressed = 0
+        self.correct_keys_pressed = 0
+        self.accuracy = 100
+        self.telemetry.clear()
+        self.game_over = False
+        self.events.clear()
+
+    def drain_events(self):
+        events, self.events = self.events, []
+        return events
+
+    def spawn_letter(self):
+        available_chars = DIFFICULTY_LEVELS[self.difficulty]["letters"]
+        letter = self.rng.choice(available_chars)
+        x = self.rng.randint(50, self.width - 50)
+        self.letters.append({
+            'char': letter,
+            'x': x,
+            'y': 0,
+            'prev_y': 0,
+            'spawn_step': self.steps,
+            'speed': self.base_speed * (1 + self.level * 0.1),
+            'color': WHITE,
+            'scale': 1.0,
+            'rotation': 0
+        })
+
+    def press(self, char):
+        """Обрабатывает нажатие; возвращает сбитую букву или ``None``."""
+        self.total_keys_pressed += 1
+        letter = self.letters.pop_oldest(char)
+
+        if letter is not None:
+            self.telemetry.record(char, OUTCOME_HIT, self.letter_age(letter))
+            self.score += (1 + self.combo)
+            self.combo += 1
+            self.max_combo = max(self.max_combo, self.combo)
+            self.correct_keys_pressed += 1
+            self.events.append((HIT, letter))
+
+            # Повышение уровня
+            if self.score > self.level * 100:
+                self.level += 1
+                self.events.append((LEVEL_UP, None))
+        else:
+            self.combo = 0
+            # У клавиш-модификаторов нет символа, а некоторые дают несколько
+            # ('ß'.upper() == 'SS'); телеметрия ведётся по одиночным символам
+            if len(char) == 1:
+                self.telemetry.record(char, OUTCOME_WRONG_KEY)
+            self.events.append((WRONG_KEY, None))
+
+        self.accuracy = round(
+            (self.correct_keys_pressed /
+             max(1, self.total_keys_pressed)) * 100
+        )
+        return letter
+
+    def letter_age(self, letter):
+        """Время с появления буквы в секундах (с точностью до шага симуляции)."""
+        return (self.steps - letter['spawn_step']) / self.sim_rate
+
+    def step(self):
+        self.steps += 1
+        # Создание новых букв
+        self.spawn_timer += 1
+        spawn_rate = DIFFICULTY_LEVELS[self.difficulty]["spawn_rate"]
+        if self.spawn_timer >= self.sim_rate // (spawn_rate + self.level * 0.2):
+            self.spawn_letter()
+            self.spawn_timer = 0
+
+        # Обновление позиций букв
+        danger_zone = self.height * 0.7
+        update_colors = self.steps % self.color_update_interval == 0
+        for letter in self.letters:
+            letter['prev_y'] = letter['y']
+            letter['y'] += letter['speed']
+            # Изменение цвета буквы при приближении к низу экрана
+            if update_colors and letter['y'] > danger_zone:
+                danger_factor = (
+                    letter['y'] - danger_zone) / (self.height - danger_zone)
+                letter['color'] = (
+                    int(255 * danger_factor),  # R
+                    int(255 * (1 - danger_factor)),  # G
+                    0  # B
+                )
+
+            if letter['y'] > self.height:
+                self.letters.remove(letter)
+                self.missed += 1
+                self.combo = 0
+                self.telemetry.record(letter['char'], OUTCOME_MISSED, self.letter_age(letter))
+                self.events.append((MISSED, letter))
+
+                if self.missed >= self.max_missed and not self.game_over:
+                    self.game_over = True
+                    self.events.append((GAME_OVER, None))
@@ -1,11 +1,26 @@
+import argparse
+import os
 import pygame
 import random
-import string
 import math
-import json
+import tempfile
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
 from enum import Enum
+from itertools import repeat
+from operator import add, mul, sub
 from datetime import datetime
 
+from assets import DEFAULT_SOUND_CACHE_DIR, SoundBank
+from engine import (DIFFICULTY_LEVELS, GAME_OVER, HIT, LEVEL_UP, MISSED, WRONG_KEY,
+                    GameEngine)
+from governor import QualityGovernor
+from profiler import FRAME, PHASES, FrameProfiler
+from replay import Recording
+from stats_store import DEFAULT_STORE_PATH, StatisticsStore
+
 
 class GameState(Enum):
     MENU = 1
@@ -16,14 +31,258 @@ class GameState(Enum):
     STATISTICS = 6
 
 
+class GlyphCache:
+    """LRU-кэш отрендеренных символов.
+
+    Ключ — символ, цвет и параметры поворота/масштаба. Цвет и трансформация
+    квантуются вызывающим кодом, поэтому все буквы кадра с одинаковым
+    символом и цветом используют одну и ту же поверхность.
+    """
+
+    def __init__(self, font, max_size=512):
+        self.font = font
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def get(self, char, color, rotation=0.0, scale=1.0):
+        key = (char, color, rotation, scale)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        if rotation or scale != 1.0:
+            surface = pygame.transform.rotozoom(self.get(char, color), rotation, scale)
+        else:
+            surface = self.font.render(char, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+# Единичные векторы направлений с шагом в 1°, чтобы не считать тригонометрию
+# для каждой частицы
+DIRECTIONS = [(math.cos(math.radians(angle)), math.sin(math.radians(angle)))
+              for angle in range(360)]
+
+
+class ParticlePool:
+    """Пул частиц в виде структуры массивов.
+
+    Все частицы живут одинаковое число шагов (``LIFETIME``) и поэтому
+    умирают в порядке появления: живые частицы занимают отрезок
+    ``[head, end)`` массивов ``array``, новые дописываются в конец, а
+    умершие отбрасываются сдвигом ``head`` по двоичному поиску шага
+    рождения. Частица летит равномерно, так что позиция вычисляется при
+    отрисовке из начальной точки и возраста, и шаг симуляции не трогает
+    отдельные частицы вовсе.
+
+    Когда массивы заканчиваются, живой отрезок переносится в начало новых
+    массивов вдвое большего размера (если он занимает больше половины) или
+    прежнего. Отрисовка идёт одним вызовом ``Surface.blits`` с заранее
+    нарисованными спрайтами для каждого цвета, а координаты считаются
+    цепочкой ``map`` над срезами массивов — без байткода на каждую частицу.
+    """
+
+    RADIUS = 3
+    # Время жизни частицы в шагах симуляции и наибольшая скорость за шаг
+    LIFETIME = 50
+    MAX_SPEED = 5
+
+    COLUMNS = ("x", "y", "dx", "dy", "born", "color")
+
+    def __init__(self, capacity=4096, rng=random):
+        self.capacity = capacity
+        # Ограничение числа частиц от регулятора качества; None — без ограничения
+        self.limit = None
+        self.rng = rng
+        self.step = 0
+        self.head = 0
+        self.end = 0
+        # Начальная позиция левого верхнего угла спрайта
+        self.x = array('d', bytes(8 * capacity))
+        self.y = array('d', bytes(8 * capacity))
+        self.dx = array('d', bytes(8 * capacity))
+        self.dy = array('d', bytes(8 * capacity))
+        self.born = array('I', bytes(4 * capacity))
+        self.color = array('B', bytes(capacity))
+        # Вспышки (шаг рождения, x, y) — по ним считаются затронутые области
+        self.bursts = deque()
+        self.palette = []
+        self.sprites = []
+
+    def __len__(self):
+        return self.end - self.head
+
+    def clear(self):
+        self.head = self.end = 0
+        self.bursts.clear()
+
+    def _color_index(self, color):
+        color = tuple(color[:3])
+        if color not in self.palette:
+            sprite = pygame.Surface((self.RADIUS * 2, self.RADIUS * 2))
+            sprite.set_colorkey((0, 0, 0) if color != (0, 0, 0) else (255, 255, 255),
+                                pygame.RLEACCEL)
+            sprite.fill(sprite.get_colorkey())
+            pygame.draw.circle(sprite, color, (self.RADIUS, self.RADIUS), self.RADIUS)
+            if pygame.display.get_surface() is not None:
+                # Спрайт в формате экрана с RLE-ключом копируется заметно быстрее
+                sprite = sprite.convert()
+            self.palette.append(color)
+            self.sprites.append(sprite)
+        return self.palette.index(color)
+
+    def _make_room(self, amount):
+        """Переносит живые частицы в начало новых массивов, при нехватке места — вдвое больших."""
+        live = len(self)
+        capacity = self.capacity
+        while live + amount > capacity // 2:
+            capacity *= 2
+        for name in self.COLUMNS:
+            values = getattr(self, name)
+            moved = values[self.head:self.end]
+            moved.frombytes(bytes(moved.itemsize * (capacity - live)))
+            setattr(self, name, moved)
+        self.capacity = capacity
+        self.head = 0
+        self.end = live
+
+    def emit(self, x, y, color, amount=10):
+        """Добавляет ``amount`` частиц; сверх ``limit`` лишние отбрасываются."""
+        if self.limit is not None:
+            amount = min(amount, self.limit - len(self))
+        if amount <= 0:
+            return
+        if self.end + amount > self.capacity:
+            self._make_room(amount)
+        color_index = self._color_index(color)
+        step = self.step
+        left, top = x - self.RADIUS, y - self.RADIUS
+        for i in range(self.end, self.end + amount):
+            cos, sin = DIRECTIONS[self.rng.randrange(360)]
+            speed = self.rng.uniform(2, self.MAX_SPEED)
+            self.x[i] = left
+            self.y[i] = top
+            self.dx[i] = speed * cos
+            self.dy[i] = speed * sin
+            self.born[i] = step
+            self.color[i] = color_index
+        self.end += amount
+        self.bursts.append((step, x, y))
+
+    def update(self):
+        """Шаг симуляции: отбрасывает частицы, прожившие ``LIFETIME`` шагов."""
+        self.step += 1
+        expired = self.step - self.LIFETIME
+        if self.head < self.end and self.born[self.head] <= expired:
+            self.head = bisect_right(self.born, expired, self.head, self.end)
+            if self.head == self.end:
+                self.head = self.end = 0
+        bursts = self.bursts
+        while bursts and bursts[0][0] <= expired:
+            bursts.popleft()
+
+    def draw(self, surface, alpha=1.0):
+        """Рисует частицы, интерполируя позицию внутри шага симуляции.
+
+        Возвращает прямоугольники вспышек, в которые попадают их частицы."""
+        head, end = self.head, self.end
+        # Возраст частицы в шагах: now - born
+        now = self.step - 1.0 + alpha
+        ages = list(map(sub, repeat(now, end - head), self.born[head:end]))
+        xs = map(int, map(add, self.x[head:end], map(mul, self.dx[head:end], ages)))
+        ys = map(int, map(add, self.y[head:end], map(mul, self.dy[head:end], ages)))
+        sprites = map(self.sprites.__getitem__, self.color[head:end])
+        surface.blits(zip(sprites, zip(xs, ys)), doreturn=False)
+
+        rects = []
+        for born, x, y in self.bursts:
+            reach = int(self.MAX_SPEED * (now - born)) + 2 * self.RADIUS
+            rects.append(pygame.Rect(int(x) - reach, int(y) - reach, 2 * reach, 2 * reach))
+        return rects
+
+
+class TextCache:
+    """LRU-кэш отрендеренных строк: строка перерисовывается, только когда
+    меняется её текст или цвет (например, счёт в HUD)."""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (id(font), text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+def quantize_color(color, step=8):
+    """Округляет каналы цвета, чтобы плавный градиент давал конечное число ключей кэша."""
+    return tuple(min(255, round(channel / step) * step) for channel in color[:3])
+
+
+# Куда сохраняется время фаз кадра, если профайлер включён по F3/F4
+DEFAULT_TIMINGS_PATH = "frame_timings.json"
+
+# Раскладка для тепловой карты клавиш на экране окончания игры
+HEATMAP_ROWS = ("1234567890", "QWERTYUIOP", "ASDFGHJKL", "ZXCVBNM")
+
+
 class KeyboardTrainer:
-    def __init__(self):
+    # При большем числе изменённых областей дешевле обновить весь экран
+    MAX_DIRTY_RECTS = 200
+
+    # Частота шагов симуляции: скорости букв и частиц, таймер появления и
+    # затухание частиц заданы в расчёте на один шаг
+    SIM_RATE = 60
+    SIM_STEP = 1 / SIM_RATE
+    # Больше шагов за кадр не делаем, чтобы не уйти в "спираль смерти"
+    MAX_SIM_STEPS = 5
+
+    def __init__(self, max_fps=60, vsync=False, sound_cache_dir=DEFAULT_SOUND_CACHE_DIR,
+                 telemetry_csv=None, record_dir=None, replay=None, profile_dump=None,
+                 profile_frames=300, stats_path=DEFAULT_STORE_PATH):
+        """``max_fps`` ограничивает частоту отрисовки (0 — без ограничения).
+
+        Если задан ``telemetry_csv``, после каждой игры туда выгружаются
+        события нажатий. Если задан ``record_dir``, туда сохраняется запись
+        ввода каждой игры; ``replay`` (``Recording``) проигрывает записанную
+        игру вместо ввода с клавиатуры.
+
+        ``profile_dump`` включает профилирование кадров с начала игры; время
+        фаз записывается в этот файл при выходе. F3 показывает оверлей с
+        FPS и временем кадра, F4 включает cProfile на ``profile_frames`` кадров.
+
+        ``stats_path`` — база статистики; бенчмарки и быстрое проигрывание
+        передают сюда путь во временном каталоге, чтобы не трогать историю
+        игрока.
+        """
         pygame.init()
         pygame.mixer.init()  # Инициализация звука
         self.WIDTH = 1200
         self.HEIGHT = 900
-        self.window = pygame.display.set_mode(
-            (self.WIDTH, self.HEIGHT), pygame.RESIZABLE)  # Начальный режим окна
+        self.max_fps = max_fps
+        self.telemetry_csv = telemetry_csv
+        self.record_dir = record_dir
+        self.recording = None
+        self.replay = replay
+        self.replay_index = 0
+        self.profile_dump = profile_dump
+        self.profile_frames = profile_frames
+        self.profiler = FrameProfiler() if profile_dump else None
+        self.show_overlay = False
+        self.overlay_surface = None
+        self.overlay_updated = 0.0
+        self.window = self._create_window(vsync)
         pygame.display.set_caption("Клавиатурный тренажёр")
 
         # Цвета
@@ -38,13 +297,18 @@ class KeyboardTrainer:
         self.main_font = pygame.font.Font(None, 74)
         self.menu_font = pygame.font.Font(None, 50)
         self.small_font = pygame.font.Font(None, 36)
+        self.tiny_font = pygame.font.Font(None, 22)
+        self.glyph_cache = GlyphCache(self.main_font)
+        self.text_cache = TextCache()
+
+        # Отрисовка: готовые статические экраны, экран, который сейчас
+        # показан (None — игра), и области, занятые на прошлом игровом кадре
+        self.screen_cache = {}
+        self.shown_screen = None
+        self.game_dirty_rects = []
 
         # Настройки сложности
-        self.difficulty_levels = {
-            "Легкий": {"speed": 2, "spawn_rate": 1.0, "letters": string.ascii_uppercase},
-            "Средний": {"speed": 3, "spawn_rate": 1.2, "letters": string.ascii_uppercase + string.digits},
-            "Сложный": {"speed": 5, "spawn_rate": 1.5, "letters": string.ascii_uppercase + string.digits}
-        }
+        self.difficulty_levels = DIFFICULTY_LEVELS
         self.current_difficulty = "Средний"
 
         # Настройки игры
@@ -52,103 +316,147 @@ class KeyboardTrainer:
             "sound_enabled": True,
             "particles_enabled": True,
             "dark_mode": True,
-            "letter_effects": True
+            "letter_effects": True,
+            "auto_quality": True
         }
+        # Регулятор снижает качество эффектов, когда кадры не укладываются
+        # в бюджет; настройки игрока при этом не меняются
+        self.governor = QualityGovernor()
 
         # Статистика
-        self.stats = self.load_statistics()
+        self.statistics = StatisticsStore(stats_path)
+        self.stats = self.statistics.aggregates
+        self.stats_version = 0
         self.session_start_time = None
 
         # Игровое состояние
         self.game_state = GameState.MENU
-        self.particles = []
+        self.particles = ParticlePool()
 
-        # Загрузка звуков
-        self.sounds = {
-            "correct": pygame.mixer.Sound("sounds/correct.mp3") if pygame.mixer.get_init() else None,
-            "wrong": pygame.mixer.Sound("sounds/incorrect.mp3") if pygame.mixer.get_init() else None,
-            "level_up": pygame.mixer.Sound("sounds/new_level.mp3") if pygame.mixer.get_init() else None
-        }
+        # Звуки загружаются в фоне, меню показывается сразу
+        self.sounds = SoundBank(cache_dir=sound_cache_dir)
 
         # Инициализация игровых параметров
+        if replay is not None:
+            self.current_difficulty = replay.difficulty
+        self.engine = GameEngine(self.WIDTH, self.HEIGHT, self.current_difficulty,
+                                 sim_rate=self.SIM_RATE)
         self.reset_game()
 
-    def load_statistics(self):
-        try:
-            with open("statistics.json", "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {
-                "total_games": 0,
-                "total_time": 0,
-                "best_scores": {"Легкий": 0, "Средний": 0, "Сложный": 0},
-                "average_accuracy": 0,
-                "total_keys_pressed": 0,
-                "correct_keys_pressed": 0,
-                "longest_combo": 0,
-                "last_session": None
-            }
-
-    def save_statistics(self):
-        with open("statistics.json", "w") as f:
-            json.dump(self.stats, f)
+    def _create_window(self, vsync):
+        if vsync:
+            try:
+                return pygame.display.set_mode(
+                    (self.WIDTH, self.HEIGHT), pygame.RESIZABLE, vsync=1)
+            except pygame.error:
+                pass  # Вертикальная синхронизация недоступна
+        return pygame.display.set_mode(
+            (self.WIDTH, self.HEIGHT), pygame.RESIZABLE)  # Начальный режим окна
 
     def reset_game(self):
-        self.letters = []
-        self.score = 0
-        self.missed = 0
-        self.base_speed = self.difficulty_levels[self.current_difficulty]["speed"]
-        self.level = 1
-        self.combo = 0
-        self.max_combo = 0
-        self.spawn_timer = 0
-        self.total_keys_pressed = 0
-        self.correct_keys_pressed = 0
-        self.accuracy = 100
+        # Своё зерно на каждую игру: по нему и записи ввода игра повторяется
+        if self.replay is not None:
+            seed = self.replay.seed
+            self.current_difficulty = self.replay.difficulty
+        else:
+            seed = random.randrange(2**32)
+        self.session_seed = seed
+        self.engine.rng = random.Random(seed)
+        self.particles.rng = random.Random(f"{seed}:particles")
+        self.engine.reset(self.current_difficulty)
         self.session_start_time = datetime.now()
-        self.particles = []
+        self.particles.clear()
+        self.replay_index = 0
+        if self.record_dir:
+            self.recording = Recording(seed, self.current_difficulty, self.SIM_RATE)
+
+    def press_key(self, char):
+        if self.recording is not None:
+            self.recording.add(self.engine.steps, char)
+        self.engine.press(char)
+        self.handle_engine_events()
+
+    def save_recording(self):
+        """Сохраняет запись ввода законченной (или прерванной) игры."""
+        recording, self.recording = self.recording, None
+        if recording is None or not self.engine.steps:
+            return
+        recording.end_step = self.engine.steps
+        name = f"session-{datetime.now():%Y%m%d-%H%M%S}-{recording.seed}.ktr"
+        try:
+            os.makedirs(self.record_dir, exist_ok=True)
+            recording.save(os.path.join(self.record_dir, name))
+        except OSError as e:
+            print(f"Не удалось сохранить запись игры: {e}")
+
+    def feed_replay(self):
+        """Передаёт движку записанные нажатия, пришедшие до текущего шага."""
+        replay = self.replay
+        while (self.replay_index < len(replay)
+               and replay.steps[self.replay_index] <= self.engine.steps):
+            self.press_key(replay.char(self.replay_index))
+            self.replay_index += 1
+        if self.engine.steps >= replay.end_step and self.game_state == GameState.PLAYING:
+            # Запись закончилась раньше, чем игра
+            self.game_state = GameState.MENU
+
+    def replay_fast(self):
+        """Проигрывает запись без отрисовки и ожидания.
+
+        Возвращает время каждого шага симуляции в секундах.
+        """
+        self.game_state = GameState.PLAYING
+        self.reset_game()
+        step_times = []
+        while self.game_state == GameState.PLAYING:
+            start = time.perf_counter()
+            self.update_game()
+            step_times.append(time.perf_counter() - start)
+        return step_times
 
     def create_particle_effect(self, x, y, color):
         if self.settings["particles_enabled"]:
-            for _ in range(10):
-                angle = random.uniform(0, 360)
-                speed = random.uniform(2, 5)
-                self.particles.append({
-                    'x': x,
-                    'y': y,
-                    'dx': speed * math.cos(math.radians(angle)),
-                    'dy': speed * math.sin(math.radians(angle)),
-                    'color': color,
-                    'life': 1.0
-                })
+            self.particles.emit(x, y, color)
 
     def update_particles(self):
-        for particle in self.particles[:]:
-            particle['x'] += particle['dx']
-            particle['y'] += particle['dy']
-            particle['life'] -= 0.02
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
-
-    def spawn_letter(self):
-        available_chars = self.difficulty_levels[self.current_difficulty]["letters"]
-        letter = random.choice(available_chars)
-        x = random.randint(50, self.WIDTH - 50)
-        self.letters.append({
-            'char': letter,
-            'x': x,
-            'y': 0,
-            'speed': self.base_speed * (1 + self.level * 0.1),
-            'color': self.WHITE,
-            'scale': 1.0,
-            'rotation': 0
-        })
+        self.particles.update()
+
+    def draw_static_screen(self, name, key, render):
+        """Показывает экран, зависящий только от ``key``.
+
+        Экран рендерится в отдельную поверхность один раз на каждое значение
+        ключа и размер окна; если он уже на экране, ничего не рисуется.
+        Возвращает области окна, которые нужно обновить.
+        """
+        key = (key, self.window.get_size())
+        if self.shown_screen == (name, key):
+            return []
+        cached = self.screen_cache.get(name)
+        if cached is None or cached[0] != key:
+            surface = pygame.Surface(self.window.get_size())
+            render(surface)
+            cached = self.screen_cache[name] = (key, surface)
+        self.window.blit(cached[1], (0, 0))
+        self.shown_screen = (name, key)
+        return [self.window.get_rect()]
+
+    def present(self, rects):
+        """Обновляет на дисплее только изменившиеся области."""
+        if rects:
+            pygame.display.update(rects)
+
+    def invalidate_display(self):
+        """Следующий кадр будет нарисован и выведен целиком."""
+        self.shown_screen = ("invalid", None)
 
     def draw_menu(self):
+        return self.draw_static_screen("menu", (self.settings["dark_mode"], self.current_difficulty), self._render_menu)
+
+    def _render_menu(self, surface):
         background_color = self.BLACK if self.settings["dark_mode"] else self.WHITE
         text_color = self.WHITE if self.settings["dark_mode"] else self.BLACK
 
-        self.window.fill(background_color)
+        surface.fill(background_color)
 
         title = self.main_font.render("Клавиатурный тренажёр", True, self.BLUE)
         start_text = self.menu_font.render(
@@ -168,35 +476,42 @@ class KeyboardTrainer:
         ]
 
         for text, y in texts:
-            self.window.blit(text, (self.WIDTH//2 - text.get_width()//2, y))
+            surface.blit(text, (self.WIDTH//2 - text.get_width()//2, y))
 
     def draw_settings(self):
-        self.window.fill(self.BLACK)
+        return self.draw_static_screen("settings", tuple(self.settings.values()), self._render_settings)
+
+    def _render_settings(self, surface):
+        surface.fill(self.BLACK)
         title = self.menu_font.render("Настройки", True, self.WHITE)
-        self.window.blit(title, (self.WIDTH//2 - title.get_width()//2, 50))
+        surface.blit(title, (self.WIDTH//2 - title.get_width()//2, 50))
 
         settings_items = [
             ("Звук", self.settings["sound_enabled"]),
             ("Частицы", self.settings["particles_enabled"]),
             ("Тёмная тема", self.settings["dark_mode"]),
-            ("Эффекты букв", self.settings["letter_effects"])
+            ("Эффекты букв", self.settings["letter_effects"]),
+            ("Автокачество", self.settings["auto_quality"])
         ]
 
         for i, (setting_name, value) in enumerate(settings_items):
             text = self.menu_font.render(
                 f"{setting_name}: {'Вкл' if value else 'Выкл'}", True, self.WHITE)
-            self.window.blit(
+            surface.blit(
                 text, (self.WIDTH//2 - text.get_width()//2, 150 + i * 60))
 
         back_text = self.small_font.render(
             "ESC - Вернуться в меню", True, self.WHITE)
-        self.window.blit(back_text, (self.WIDTH//2 -
+        surface.blit(back_text, (self.WIDTH//2 -
                          back_text.get_width()//2, self.HEIGHT - 50))
 
     def draw_statistics(self):
-        self.window.fill(self.BLACK)
+        return self.draw_static_screen("statistics", self.stats_version, self._render_statistics)
+
+    def _render_statistics(self, surface):
+        surface.fill(self.BLACK)
         title = self.menu_font.render("Статистика", True, self.WHITE)
-        self.window.blit(title, (self.WIDTH//2 - title.get_width()//2, 50))
+        surface.blit(title, (self.WIDTH//2 - title.get_width()//2, 50))
 
         stats_items = [
             f"Всего игр: {self.stats['total_games']}",
@@ -207,90 +522,265 @@ class KeyboardTrainer:
             f"Средняя точность: {self.stats['average_accuracy']}%",
             f"Лучшее комбо: {self.stats['longest_combo']}"
         ]
+        trend = self.statistics.accuracy_trend()
+        if trend:
+            stats_items.append(
+                "Точность в последних играх: " + " ".join(f"{value}%" for value in trend))
+        worst_keys = self.statistics.key_error_rates(limit=3)
+        if worst_keys:
+            stats_items.append(
+                "Больше всего ошибок: " + ", ".join(f"{key} ({rate:.0%})" for key, rate in worst_keys))
 
         for i, stat in enumerate(stats_items):
             text = self.small_font.render(stat, True, self.WHITE)
-            self.window.blit(
+            surface.blit(
                 text, (self.WIDTH//2 - text.get_width()//2, 150 + i * 40))
 
         back_text = self.small_font.render(
             "ESC - Вернуться в меню", True, self.WHITE)
-        self.window.blit(back_text, (self.WIDTH//2 -
+        surface.blit(back_text, (self.WIDTH//2 -
                          back_text.get_width()//2, self.HEIGHT - 50))
 
-    def draw_game(self):
+    def draw_game(self, alpha=1.0):
+        """``alpha`` — доля шага симуляции, прошедшая с последнего обновления;
+        позиции интерполируются между предыдущим и текущим шагом.
+
+        Стирает только области прошлого кадра и возвращает список областей
+        для обновления дисплея."""
         background_color = self.BLACK if self.settings["dark_mode"] else self.WHITE
-        text_color = self.WHITE if self.settings["dark_mode"] else self.BLACK
 
-        self.window.fill(background_color)
+        full_redraw = (self.shown_screen is not None
+                       or len(self.game_dirty_rects) > self.MAX_DIRTY_RECTS)
+        if full_redraw:
+            self.window.fill(background_color)
+        else:
+            for rect in self.game_dirty_rects:
+                self.window.fill(background_color, rect)
+        dirty = [] if full_redraw else self.game_dirty_rects
+        rects = []
 
         # Отрисовка частиц
         if self.settings["particles_enabled"]:
-            for particle in self.particles:
-                alpha = int(255 * particle['life'])
-                color = (*particle['color'][:3], alpha)
-                pygame.draw.circle(self.window, color,
-                                   (int(particle['x']), int(particle['y'])), 3)
-
-        # Отрисовка букв с эффектами
-        for letter in self.letters:
-            if self.settings["letter_effects"]:
-                letter['rotation'] = math.sin(
-                    pygame.time.get_ticks() * 0.003) * 10
-                letter['scale'] = 1.0 + \
-                    math.sin(pygame.time.get_ticks() * 0.005) * 0.1
-
-            text = self.main_font.render(letter['char'], True, letter['color'])
-            if self.settings["letter_effects"]:
-                text = pygame.transform.rotozoom(
-                    text, letter['rotation'], letter['scale'])
-
-            self.window.blit(
-                text, (letter['x'] - text.get_width()//2, letter['y']))
+            rects += self.particles.draw(self.window, alpha)
+
+        # Отрисовка букв с эффектами. Поворот и масштаб зависят только от
+        # времени, поэтому считаются один раз на кадр и квантуются
+        # (0.5° и 0.01), чтобы трансформированные глифы брались из кэша
+        rotation, scale = 0.0, 1.0
+        if self.settings["letter_effects"] and self.governor.quality["letter_effects"]:
+            ticks = pygame.time.get_ticks()
+            rotation = round(math.sin(ticks * 0.003) * 10 * 2) / 2
+            scale = round(1.0 + math.sin(ticks * 0.005) * 0.1, 2)
+
+        for letter in self.engine.letters:
+            letter['rotation'] = rotation
+            letter['scale'] = scale
+            text = self.glyph_cache.get(
+                letter['char'], quantize_color(letter['color']), rotation, scale)
+            y = letter['prev_y'] + (letter['y'] - letter['prev_y']) * alpha
+            rects.append(self.window.blit(
+                text, (letter['x'] - text.get_width()//2, y)))
 
         # Отрисовка игровой информации
         info_texts = [
-            (f"Счёт: {self.score}", self.WHITE),
-            (f"Уровень: {self.level}", self.GREEN),
-            (f"Комбо: {self.combo}", self.BLUE),
-            (f"Макс. комбо: {self.max_combo}", self.YELLOW),
-            (f"Точность: {self.accuracy}%", self.WHITE)
+            (f"Счёт: {self.engine.score}", self.WHITE),
+            (f"Уровень: {self.engine.level}", self.GREEN),
+            (f"Комбо: {self.engine.combo}", self.BLUE),
+            (f"Макс. комбо: {self.engine.max_combo}", self.YELLOW),
+            (f"Точность: {self.engine.accuracy}%", self.WHITE)
         ]
 
         for i, (text, color) in enumerate(info_texts):
-            surface = self.menu_font.render(text, True, color)
-            self.window.blit(surface, (10, 10 + i * 50))
+            surface = self.text_cache.render(self.menu_font, text, color)
+            rects.append(self.window.blit(surface, (10, 10 + i * 50)))
+
+        self.game_dirty_rects = rects
+        self.shown_screen = None
+        dirty = dirty + rects
+        if full_redraw or len(dirty) > self.MAX_DIRTY_RECTS:
+            return [self.window.get_rect()]
+        return dirty
 
     def update_statistics(self):
+        if self.replay is not None:
+            return  # Повтор записи — не новая игра
         session_duration = int(
             (datetime.now() - self.session_start_time).total_seconds())
-        self.stats["total_games"] += 1
-        self.stats["total_time"] += session_duration
-        self.stats["best_scores"][self.current_difficulty] = max(
-            self.stats["best_scores"][self.current_difficulty],
-            self.score
-        )
-        self.stats["longest_combo"] = max(
-            self.stats["longest_combo"], self.max_combo)
-        self.stats["total_keys_pressed"] += self.total_keys_pressed
-        self.stats["correct_keys_pressed"] += self.correct_keys_pressed
-        self.stats["average_accuracy"] = round(
-            (self.stats["correct_keys_pressed"] /
-             max(1, self.stats["total_keys_pressed"])) * 100
-        )
-        self.stats["last_session"] = datetime.now().strftime(
-            "%Y-%m-%d %H:%M:%S")
-        self.save_statistics()
+        session = {
+            "ended_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "difficulty": self.current_difficulty,
+            "duration": session_duration,
+            "score": self.engine.score,
+            "max_combo": self.engine.max_combo,
+            "keys_pressed": self.engine.total_keys_pressed,
+            "correct_keys": self.engine.correct_keys_pressed
+        }
+        key_stats = {key: (stats.hits + stats.wrong, stats.wrong)
+                     for key, stats in self.engine.telemetry.keys.items()
+                     if stats.hits + stats.wrong}
+        # Сводка обновляется сразу, запись на диск идёт в фоновом потоке
+        self.statistics.record_session(session, key_stats)
+        self.stats_version += 1
+
+    def update_game(self):
+        """Один шаг симуляции длиной SIM_STEP (скорости заданы за шаг)."""
+        if self.replay is not None:
+            self.feed_replay()
+            if self.game_state != GameState.PLAYING:
+                return
+        profiler = self.profiler
+        self.engine.step()
+        self.handle_engine_events()
+        if profiler is not None:
+            profiler.mark("simulation")
+
+        # Обновление частиц
+        if self.settings["particles_enabled"]:
+            self.update_particles()
+        if profiler is not None:
+            profiler.mark("particles")
+
+    def apply_quality(self):
+        """Применяет текущую ступень качества регулятора."""
+        quality = self.governor.quality
+        self.particles.limit = quality["particle_limit"]
+        self.engine.color_update_interval = quality["danger_color_interval"]
+
+    def enable_profiler(self):
+        if self.profiler is None:
+            self.profiler = FrameProfiler()
+        return self.profiler
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.enable_profiler()
+            self.overlay_surface = None
+            self.overlay_updated = 0.0
+        self.invalidate_display()
+
+    def draw_overlay(self):
+        """Оверлей профайлера в правом верхнем углу; текст обновляется дважды в секунду."""
+        now = time.perf_counter()
+        if now - self.overlay_updated >= 0.5:
+            self.overlay_updated = now
+            self.overlay_surface = self._render_overlay()
+        rect = self.overlay_surface.get_rect(topright=(self.window.get_width() - 10, 10))
+        self.window.blit(self.overlay_surface, rect)
+        return [rect]
+
+    def _render_overlay(self):
+        profiler = self.profiler
+        (frame_p99,) = profiler.times[FRAME].percentiles((0.99,))
+        lines = [
+            f"FPS {profiler.fps():.0f}   кадр p99 {frame_p99 * 1000:.1f} мс",
+            f"букв {len(self.engine.letters)}   частиц {len(self.particles)}",
+            f"ступень качества {self.governor.level}"
+        ]
+        for phase in PHASES:
+            (p99,) = profiler.times[phase].percentiles((0.99,))
+            lines.append(f"{phase}: p99 {p99 * 1000:.2f} мс")
+        if profiler.capture is not None:
+            lines.append(f"cProfile: осталось {profiler.capture_frames} кадров")
+
+        rendered = [self.tiny_font.render(line, True, self.YELLOW) for line in lines]
+        line_height = self.tiny_font.get_linesize()
+        # Панель не сужается: иначе на экране остался бы край прошлой панели
+        previous = self.overlay_surface.get_size() if self.overlay_surface else (0, 0)
+        surface = pygame.Surface((max(previous[0], max(text.get_width() for text in rendered) + 16),
+                                  max(previous[1], line_height * len(rendered) + 12)))
+        surface.fill((20, 20, 20))
+        for i, text in enumerate(rendered):
+            surface.blit(text, (8, 6 + i * line_height))
+        return surface
+
+    def dump_timings(self):
+        path = self.profile_dump or DEFAULT_TIMINGS_PATH
+        try:
+            self.profiler.dump(path)
+            print(f"Время фаз кадра сохранено в {path}")
+        except OSError as e:
+            print(f"Не удалось сохранить время фаз кадра: {e}")
+
+    def finish_profile_capture(self, capture):
+        path = f"profile-{datetime.now():%Y%m%d-%H%M%S}.prof"
+        try:
+            print(FrameProfiler.save_capture(capture, path))
+            print(f"Профиль сохранён в {path}")
+        except OSError as e:
+            print(f"Не удалось сохранить профиль: {e}")
+
+    def handle_engine_events(self):
+        """Звуки, частицы и смена экрана по событиям движка."""
+        for event, letter in self.engine.drain_events():
+            if event == HIT:
+                # Эффекты при правильном нажатии
+                if self.settings["particles_enabled"]:
+                    self.create_particle_effect(
+                        letter['x'], letter['y'], self.GREEN)
+
+                # Звуковой эффект
+                if self.settings["sound_enabled"]:
+                    self.sounds.play("correct")
+
+            elif event == LEVEL_UP:
+                if self.settings["sound_enabled"]:
+                    self.sounds.play("level_up")
+
+            elif event == WRONG_KEY:
+                if self.settings["sound_enabled"]:
+                    self.sounds.play("wrong")
+                if self.settings["particles_enabled"]:
+                    self.create_particle_effect(
+                        self.WIDTH//2,
+                        self.HEIGHT//2,
+                        self.RED
+                    )
+
+            elif event == MISSED:
+                if self.settings["particles_enabled"]:
+                    self.create_particle_effect(
+                        letter['x'],
+                        self.HEIGHT,
+                        self.RED
+                    )
+
+            elif event == GAME_OVER:
+                self.game_state = GameState.GAME_OVER
+                self.save_recording()
+                self.update_statistics()
+                if self.telemetry_csv:
+                    self.export_telemetry(self.telemetry_csv)
+
+    def export_telemetry(self, path):
+        try:
+            self.engine.telemetry.export_csv(path)
+        except OSError as e:
+            print(f"Не удалось сохранить телеметрию: {e}")
 
     def run(self):
         clock = pygame.time.Clock()
         running = True
+        accumulator = 0.0
+        frame_time = 0.0
+        if self.replay is not None:
+            self.game_state = GameState.PLAYING
+            self.reset_game()
 
         while running:
+            frame_start = time.perf_counter()
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.begin_frame()
+
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
 
+                # Содержимое окна могло быть потеряно — перерисовываем целиком
+                if event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                    self.invalidate_display()
+
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         if self.game_state in [GameState.SETTINGS, GameState.STATISTICS]:
@@ -298,6 +788,11 @@ class KeyboardTrainer:
                         elif self.game_state == GameState.PLAYING:
                             self.game_state = GameState.PAUSED
 
+                    elif event.key == pygame.K_F3:
+                        self.toggle_overlay()
+                    elif event.key == pygame.K_F4:
+                        self.enable_profiler().start_capture(self.profile_frames)
+
                     elif self.game_state == GameState.MENU:
                         if event.key == pygame.K_SPACE:
                             self.game_state = GameState.PLAYING
@@ -308,6 +803,7 @@ class KeyboardTrainer:
                             self.game_state = GameState.STATISTICS
                         elif event.key == pygame.K_F11:  # F11 для переключения полноэкранного режима
                             pygame.display.toggle_fullscreen()
+                            self.invalidate_display()
                         elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
                             difficulties = list(self.difficulty_levels.keys())
                             current_index = difficulties.index(
@@ -329,57 +825,20 @@ class KeyboardTrainer:
                             self.settings["dark_mode"] = not self.settings["dark_mode"]
                         elif event.key == pygame.K_4:
                             self.settings["letter_effects"] = not self.settings["letter_effects"]
+                        elif event.key == pygame.K_5:
+                            self.settings["auto_quality"] = not self.settings["auto_quality"]
+                            if not self.settings["auto_quality"]:
+                                self.governor.reset(level=0)
+                                self.apply_quality()
 
                     elif self.game_state == GameState.PLAYING:
-                        self.total_keys_pressed += 1
-                        key_pressed = event.unicode.upper()
-                        matched = False
-
-                        for letter in self.letters[:]:
-                            if letter['char'] == key_pressed:
-                                self.letters.remove(letter)
-                                self.score += (1 + self.combo)
-                                self.combo += 1
-                                self.max_combo = max(
-                                    self.max_combo, self.combo)
-                                self.correct_keys_pressed += 1
-                                matched = True
-
-                                # Эффекты при правильном нажатии
-                                if self.settings["particles_enabled"]:
-                                    self.create_particle_effect(
-                                        letter['x'], letter['y'], self.GREEN)
-
-                                # Звуковой эффект
-                                if self.settings["sound_enabled"] and self.sounds["correct"]:
-                                    self.sounds["correct"].play()
-
-                                # Повышение уровня
-                                if self.score > self.level * 100:
-                                    self.level += 1
-                                    if self.settings["sound_enabled"] and self.sounds["level_up"]:
-                                        self.sounds["level_up"].play()
-                                break
-
-                        if not matched:
-                            self.combo = 0
-                            if self.settings["sound_enabled"] and self.sounds["wrong"]:
-                                self.sounds["wrong"].play()
-                            if self.settings["particles_enabled"]:
-                                self.create_particle_effect(
-                                    self.WIDTH//2,
-                                    self.HEIGHT//2,
-                                    self.RED
-                                )
-
-                        self.accuracy = round(
-                            (self.correct_keys_pressed /
-                             max(1, self.total_keys_pressed)) * 100
-                        )
+                        # При повторе записи нажатия берутся из неё
+                        if self.replay is None:
+                            self.press_key(event.unicode.upper())
 
                     elif self.game_state == GameState.GAME_OVER:
                         if event.key == pygame.K_r:
-                            self.update_statistics()
+                            # Статистика уже записана при окончании игры
                             self.game_state = GameState.MENU
                             self.reset_game()
                         elif event.key == pygame.K_q:
@@ -389,90 +848,125 @@ class KeyboardTrainer:
                         if event.key == pygame.K_SPACE:
                             self.game_state = GameState.PLAYING
                         elif event.key == pygame.K_q:
+                            self.save_recording()
                             self.game_state = GameState.MENU
 
+            # Профайлер мог появиться по F3/F4 в этом кадре
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.mark("events")
+
+            # Симуляция идёт фиксированными шагами независимо от частоты
+            # кадров; при перегрузке лишнее время отбрасывается, а не копится
             if self.game_state == GameState.PLAYING:
-                # Создание новых букв
-                self.spawn_timer += 1
-                spawn_rate = self.difficulty_levels[self.current_difficulty]["spawn_rate"]
-                if self.spawn_timer >= 60 // (spawn_rate + self.level * 0.2):
-                    self.spawn_letter()
-                    self.spawn_timer = 0
-
-                # Обновление позиций букв
-                for letter in self.letters[:]:
-                    letter['y'] += letter['speed']
-                    # Изменение цвета буквы при приближении к низу экрана
-                    danger_zone = self.HEIGHT * 0.7
-                    if letter['y'] > danger_zone:
-                        danger_factor = (
-                            letter['y'] - danger_zone) / (self.HEIGHT - danger_zone)
-                        letter['color'] = (
-                            int(255 * danger_factor),  # R
-                            int(255 * (1 - danger_factor)),  # G
-                            0  # B
-                        )
-
-                    if letter['y'] > self.HEIGHT:
-                        self.letters.remove(letter)
-                        self.missed += 1
-                        self.combo = 0
-
-                        if self.settings["particles_enabled"]:
-                            self.create_particle_effect(
-                                letter['x'],
-                                self.HEIGHT,
-                                self.RED
-                            )
-
-                        if self.missed >= 10:
-                            self.game_state = GameState.GAME_OVER
-                            self.update_statistics()
-
-                # Обновление частиц
-                if self.settings["particles_enabled"]:
-                    self.update_particles()
+                accumulator += min(frame_time, self.SIM_STEP * self.MAX_SIM_STEPS)
+                while accumulator >= self.SIM_STEP and self.game_state == GameState.PLAYING:
+                    self.update_game()
+                    accumulator -= self.SIM_STEP
+            else:
+                accumulator = 0.0
 
             # Отрисовка
             if self.game_state == GameState.MENU:
-                self.draw_menu()
+                dirty = self.draw_menu()
             elif self.game_state == GameState.PLAYING:
-                self.draw_game()
+                dirty = self.draw_game(accumulator / self.SIM_STEP)
             elif self.game_state == GameState.GAME_OVER:
-                self.draw_game_over()
+                dirty = self.draw_game_over()
             elif self.game_state == GameState.SETTINGS:
-                self.draw_settings()
+                dirty = self.draw_settings()
             elif self.game_state == GameState.STATISTICS:
-                self.draw_statistics()
+                dirty = self.draw_statistics()
             elif self.game_state == GameState.PAUSED:
-                self.draw_pause_screen()
-
-            pygame.display.update()
-            clock.tick(60)
-
+                dirty = self.draw_pause_screen()
+            if self.show_overlay:
+                dirty = dirty + self.draw_overlay()
+            if profiler is not None:
+                profiler.mark("draw")
+            # Регулятору нужно время работы кадра без вывода на экран: с
+            # вертикальной синхронизацией present ждёт обратного хода луча,
+            # и кадр всегда казался бы занимающим весь бюджет
+            work_time = time.perf_counter() - frame_start
+
+            self.present(dirty)
+            if profiler is not None:
+                profiler.mark("present")
+
+            if self.game_state == GameState.PLAYING and self.settings["auto_quality"]:
+                if self.governor.observe(work_time):
+                    self.apply_quality()
+            frame_time = clock.tick(self.max_fps) / 1000
+            if profiler is not None:
+                capture = profiler.end_frame()
+                if capture is not None:
+                    self.finish_profile_capture(capture)
+
+        if self.profiler is not None:
+            self.dump_timings()
+
+        self.statistics.close()
         pygame.quit()
 
     def draw_game_over(self):
-        self.window.fill(self.BLACK)
+        # stats_version меняется с каждой законченной игрой
+        return self.draw_static_screen("game_over", self.stats_version, self._render_game_over)
 
+    def _render_game_over(self, surface):
+        surface.fill(self.BLACK)
+
+        p50, p95 = self.engine.telemetry.percentiles()
+        reaction = (f"Реакция: медиана {p50 * 1000:.0f} мс, p95 {p95 * 1000:.0f} мс"
+                    if self.engine.telemetry.reactions.count else "Реакция: нет попаданий")
         texts = [
             ("ИГРА ОКОНЧЕНА!", self.RED, self.main_font),
-            (f"Финальный счёт: {self.score}", self.WHITE, self.menu_font),
-            (f"Максимальное комбо: {self.max_combo}",
+            (f"Финальный счёт: {self.engine.score}", self.WHITE, self.menu_font),
+            (f"Максимальное комбо: {self.engine.max_combo}",
              self.BLUE, self.menu_font),
-            (f"Точность: {self.accuracy}%", self.GREEN, self.menu_font),
+            (f"Точность: {self.engine.accuracy}%", self.GREEN, self.menu_font),
+            (reaction, self.YELLOW, self.small_font),
             ("R - Начать заново", self.WHITE, self.menu_font),
             ("Q - Выйти", self.WHITE, self.menu_font)
         ]
 
         for i, (text, color, font) in enumerate(texts):
-            surface = font.render(text, True, color)
-            self.window.blit(
-                surface,
-                (self.WIDTH//2 - surface.get_width()//2, 150 + i * 70)
+            text_surface = font.render(text, True, color)
+            surface.blit(
+                text_surface,
+                (self.WIDTH//2 - text_surface.get_width()//2, 80 + i * 60)
             )
 
+        self._render_key_heatmap(surface, 530)
+
+    def _render_key_heatmap(self, surface, top):
+        """Клавиатура, где цвет клавиши — доля ошибок, подпись — медиана реакции."""
+        heatmap = self.engine.telemetry.heatmap()
+        size, gap = 56, 6
+        for row_index, row in enumerate(HEATMAP_ROWS):
+            row_width = len(row) * (size + gap) - gap
+            left = self.WIDTH//2 - row_width//2 + row_index * 12
+            y = top + row_index * (size + gap)
+            for i, char in enumerate(row):
+                rect = pygame.Rect(left + i * (size + gap), y, size, size)
+                data = heatmap.get(char)
+                if data is None:
+                    pygame.draw.rect(surface, (40, 40, 40), rect, border_radius=6)
+                    color = (120, 120, 120)
+                else:
+                    error_rate, median = data
+                    pygame.draw.rect(surface, (int(200 * error_rate), int(160 * (1 - error_rate)), 40),
+                                     rect, border_radius=6)
+                    color = self.WHITE
+                label = self.small_font.render(char, True, color)
+                surface.blit(label, (rect.centerx - label.get_width()//2, rect.y + 6))
+                if data is not None and not math.isnan(data[1]):
+                    ms = self.tiny_font.render(f"{data[1] * 1000:.0f}", True, color)
+                    surface.blit(ms, (rect.centerx - ms.get_width()//2, rect.bottom - 20))
+
     def draw_pause_screen(self):
+        # Пауза рисуется один раз поверх последнего игрового кадра
+        if self.shown_screen == ("pause", None):
+            return []
+
         # Полупрозрачное затемнение
         overlay = pygame.Surface((self.WIDTH, self.HEIGHT))
         overlay.fill(self.BLACK)
@@ -486,13 +980,77 @@ class KeyboardTrainer:
         ]
 
         for i, (text, color, font) in enumerate(texts):
-            surface = font.render(text, True, color)
+            surface = self.text_cache.render(font, text, color)
             self.window.blit(
                 surface,
                 (self.WIDTH//2 - surface.get_width()//2, 200 + i * 70)
             )
+        self.shown_screen = ("pause", None)
+        return [self.window.get_rect()]
+
+
+def print_replay_report(game, step_times):
+    print(f"Шагов: {len(step_times)}, счёт: {game.engine.score}, "
+          f"точность: {game.engine.accuracy}%")
+    if not step_times:
+        return
+    step_times = sorted(step_times)
+    percentiles = ", ".join(
+        f"p{round(q * 100)} {step_times[min(len(step_times) - 1, int(len(step_times) * q))] * 1e6:.1f}"
+        for q in (0.5, 0.95, 0.99))
+    print(f"Время шага, мкс: среднее {sum(step_times) / len(step_times) * 1e6:.1f}, {percentiles}")
 
 
 if __name__ == "__main__":
-    game = KeyboardTrainer()
-    game.run()
+    parser = argparse.ArgumentParser(description="Клавиатурный тренажёр")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="ограничение частоты кадров (0 — без ограничения)")
+    parser.add_argument("--vsync", action="store_true",
+                        help="вертикальная синхронизация")
+    parser.add_argument("--telemetry-csv", metavar="ФАЙЛ",
+                        help="выгружать события нажатий после каждой игры в CSV")
+    parser.add_argument("--record", metavar="КАТАЛОГ",
+                        help="сохранять запись ввода каждой игры в каталог")
+    parser.add_argument("--replay", metavar="ФАЙЛ",
+                        help="проиграть записанную игру")
+    parser.add_argument("--fast", action="store_true",
+                        help="с --replay: проиграть без отрисовки и вывести время шагов")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_TIMINGS_PATH, metavar="ФАЙЛ",
+                        help="профилировать фазы кадра и сохранить их время при выходе "
+                             f"(по умолчанию в {DEFAULT_TIMINGS_PATH})")
+    parser.add_argument("--profile-frames", type=int, default=300, metavar="N",
+                        help="сколько кадров записывать в cProfile по F4")
+    args = parser.parse_args()
+
+    replay = None
+    if args.replay:
+        try:
+            replay = Recording.load(args.replay)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        if replay.sim_rate != KeyboardTrainer.SIM_RATE:
+            parser.error(f"запись сделана при {replay.sim_rate} шагах в секунду, "
+                         f"а игра работает при {KeyboardTrainer.SIM_RATE}")
+    elif args.fast:
+        parser.error("--fast используется только вместе с --replay")
+
+    if args.fast:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    # Быстрое проигрывание статистику не пишет, но база открывается при
+    # запуске — держим её во временном каталоге
+    stats_dir = tempfile.TemporaryDirectory() if args.fast else None
+    game = KeyboardTrainer(max_fps=args.fps, vsync=args.vsync,
+                           telemetry_csv=args.telemetry_csv,
+                           record_dir=args.record, replay=replay,
+                           profile_dump=args.profile, profile_frames=args.profile_frames,
+                           stats_path=os.path.join(stats_dir.name, "statistics.sqlite")
+                           if stats_dir else DEFAULT_STORE_PATH)
+    if args.fast:
+        print_replay_report(game, game.replay_fast())
+        game.statistics.close()
+        pygame.quit()
+        stats_dir.cleanup()
+    else:
+        game.run()
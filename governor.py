@@ -0,0 +1,70 @@
+"""Автоматическое снижение качества эффектов при нехватке времени кадра.
+
+``QualityGovernor`` получает время работы каждого кадра — без вывода на
+экран (с vsync он ждёт обратного хода луча) и без ожидания ограничителя
+FPS — и раз в ``block`` кадров сравнивает среднее с бюджетом кадра. Если
+кадры не укладываются в бюджет, качество понижается на одну ступень;
+повышается оно, только когда запас держится несколько блоков подряд —
+иначе игра металась бы между ступенями.
+"""
+
+FRAME_BUDGET = 1 / 60
+
+# Ступени качества, от полного к минимальному. particle_limit — сколько
+# частиц может быть одновременно (None — без ограничения),
+# danger_color_interval — раз в сколько шагов пересчитывается цвет букв в
+# опасной зоне
+QUALITY_LEVELS = (
+    {"particle_limit": None, "letter_effects": True, "danger_color_interval": 1},
+    {"particle_limit": 300, "letter_effects": True, "danger_color_interval": 1},
+    {"particle_limit": 300, "letter_effects": False, "danger_color_interval": 1},
+    {"particle_limit": 300, "letter_effects": False, "danger_color_interval": 6},
+)
+
+
+class QualityGovernor:
+    def __init__(self, budget=FRAME_BUDGET, block=30, degrade_at=0.85, restore_at=0.5,
+                 restore_blocks=4):
+        self.budget = budget
+        self.block = block
+        self.degrade_at = degrade_at
+        self.restore_at = restore_at
+        self.restore_blocks = restore_blocks
+        self.level = 0
+        self.reset()
+
+    def reset(self, level=None):
+        if level is not None:
+            self.level = level
+        self.frames = 0
+        self.total = 0.0
+        self.calm_blocks = 0
+
+    @property
+    def quality(self):
+        return QUALITY_LEVELS[self.level]
+
+    def observe(self, work_time):
+        """Учитывает кадр; возвращает ``True``, если ступень качества сменилась."""
+        self.frames += 1
+        self.total += work_time
+        if self.frames < self.block:
+            return False
+
+        load = self.total / self.frames / self.budget
+        self.frames = 0
+        self.total = 0.0
+        if load > self.degrade_at:
+            self.calm_blocks = 0
+            if self.level < len(QUALITY_LEVELS) - 1:
+                self.level += 1
+                return True
+        elif load < self.restore_at:
+            self.calm_blocks += 1
+            if self.calm_blocks >= self.restore_blocks and self.level > 0:
+                self.calm_blocks = 0
+                self.level -= 1
+                return True
+        else:
+            self.calm_blocks = 0
+        return False
@@ -0,0 +1,153 @@
+"""Профилирование кадров тренажёра.
+
+``FrameProfiler`` меряет, сколько времени в каждом кадре ушло на каждую
+фазу игрового цикла, и хранит последние ``window`` кадров в кольцевых
+буферах ``array``. Фаза отмечается вызовом ``mark`` в её конце: время с
+предыдущей отметки добавляется к фазе текущего кадра, поэтому фаза может
+встречаться в кадре несколько раз (например, шаги симуляции).
+
+Когда профилирование выключено, игра не создаёт профайлер вовсе, и цена
+сводится к проверке ``is not None`` на каждой фазе.
+"""
+import cProfile
+import io
+import json
+import math
+import pstats
+import time
+from array import array
+
+PHASES = ("events", "simulation", "particles", "draw", "present")
+FRAME = "frame"
+
+# Границы корзин гистограммы времени кадра, мс
+FRAME_HISTOGRAM_BOUNDS = (4, 8, 16.7, 33.3, 50, 100)
+
+
+class RollingTimes:
+    """Последние ``size`` замеров в кольцевом буфере."""
+
+    def __init__(self, size):
+        self.values = array('d', bytes(8 * size))
+        self.head = 0
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.head] = value
+        self.head = (self.head + 1) % len(self.values)
+        if self.count < len(self.values):
+            self.count += 1
+
+    def samples(self):
+        return self.values[:self.count]
+
+    def mean(self):
+        return sum(self.samples()) / self.count if self.count else math.nan
+
+    def percentiles(self, fractions):
+        """Значения для каждой доли из ``fractions`` (одна сортировка на все)."""
+        values = sorted(self.samples())
+        if not values:
+            return [math.nan] * len(fractions)
+        return [values[min(len(values) - 1, int(len(values) * q))] for q in fractions]
+
+    def histogram(self, bounds):
+        """Число замеров в каждой корзине ``(-inf, b0], (b0, b1], ... (bn, inf)``."""
+        counts = [0] * (len(bounds) + 1)
+        for value in self.samples():
+            for i, bound in enumerate(bounds):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+
+class FrameProfiler:
+    def __init__(self, window=600):
+        self.times = {phase: RollingTimes(window) for phase in PHASES + (FRAME,)}
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frames = 0
+        self.frame_start = self.last = time.perf_counter()
+        self.capture = None
+        self.capture_frames = 0
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        current = self.current
+        for phase in PHASES:
+            self.times[phase].add(current[phase])
+            current[phase] = 0.0
+        self.times[FRAME].add(now - self.frame_start)
+        self.frames += 1
+
+        if self.capture is not None:
+            self.capture_frames -= 1
+            if self.capture_frames <= 0:
+                return self._finish_capture()
+        return None
+
+    def fps(self):
+        mean = self.times[FRAME].mean()
+        return 1 / mean if mean else 0.0
+
+    # cProfile по запросу
+
+    def start_capture(self, frames):
+        """Включает cProfile на следующие ``frames`` кадров."""
+        if self.capture is not None:
+            return
+        self.capture = cProfile.Profile()
+        self.capture_frames = frames
+        self.capture.enable()
+
+    def _finish_capture(self):
+        """Выключает cProfile и возвращает собранную статистику."""
+        capture, self.capture = self.capture, None
+        capture.disable()
+        return capture
+
+    @staticmethod
+    def save_capture(capture, path, top=15):
+        """Сохраняет профиль для pstats/snakeviz и возвращает краткую сводку."""
+        capture.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(capture, stream=summary).sort_stats("cumulative").print_stats(top)
+        return summary.getvalue()
+
+    # Итоги
+
+    def summary(self):
+        """Сводка по фазам в миллисекундах, пригодная для JSON."""
+        phases = {}
+        for phase, times in self.times.items():
+            p50, p95, p99, worst = times.percentiles((0.5, 0.95, 0.99, 1.0))
+            phases[phase] = {
+                "mean_ms": times.mean() * 1000,
+                "p50_ms": p50 * 1000,
+                "p95_ms": p95 * 1000,
+                "p99_ms": p99 * 1000,
+                "max_ms": worst * 1000
+            }
+        histogram = self.times[FRAME].histogram([bound / 1000 for bound in FRAME_HISTOGRAM_BOUNDS])
+        labels = [f"<={bound}" for bound in FRAME_HISTOGRAM_BOUNDS]
+        labels.append(f">{FRAME_HISTOGRAM_BOUNDS[-1]}")
+        return {
+            "frames": self.frames,
+            "window": self.times[FRAME].count,
+            "phases": phases,
+            "frame_histogram_ms": dict(zip(labels, histogram))
+        }
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
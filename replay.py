@@ -0,0 +1,86 @@
+"""Запись и воспроизведение ввода одной игры.
+
+Игра детерминирована при заданном зерне генератора: буквы появляются по
+шагам симуляции, а нажатия привязаны к номеру шага, после которого они
+произошли. Поэтому для точного повтора игры достаточно зерна, сложности
+и списка пар (шаг, символ).
+
+Формат файла (little-endian): заголовок ``HEADER``, название сложности в
+UTF-8, затем два массива uint32 по ``count`` элементов — номера шагов и
+коды символов (0 — клавиша без символа).
+"""
+import struct
+import sys
+from array import array
+
+MAGIC = b"KTRC"
+VERSION = 1
+
+# magic, версия, зерно, шагов в секунду, последний шаг, длина сложности, число нажатий
+HEADER = struct.Struct("<4sBIHIBI")
+
+
+class Recording:
+    """Зерно, сложность и нажатия одной игры."""
+
+    def __init__(self, seed, difficulty, sim_rate):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.sim_rate = sim_rate
+        # Шаг, на котором игра закончилась (или запись была остановлена)
+        self.end_step = 0
+        self.steps = array('I')
+        self.codes = array('I')
+
+    def __len__(self):
+        return len(self.steps)
+
+    def add(self, step, char):
+        self.steps.append(step)
+        # Нажатие без символа или с несколькими ('ß'.upper() == 'SS') ничего
+        # не сбивает, поэтому для повтора оно равносильно клавише без символа
+        self.codes.append(ord(char) if len(char) == 1 else 0)
+
+    def char(self, index):
+        code = self.codes[index]
+        return chr(code) if code else ""
+
+    def save(self, path):
+        difficulty = self.difficulty.encode("utf-8")
+        steps, codes = self.steps, self.codes
+        if sys.byteorder == "big":
+            steps, codes = array('I', steps), array('I', codes)
+            steps.byteswap()
+            codes.byteswap()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.seed, self.sim_rate,
+                                self.end_step, len(difficulty), len(steps)))
+            f.write(difficulty)
+            f.write(steps.tobytes())
+            f.write(codes.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            raise ValueError(f"{path}: это не запись игры")
+        magic, version, seed, sim_rate, end_step, name_length, count = \
+            HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия записи {version}")
+
+        offset = HEADER.size
+        difficulty = data[offset:offset + name_length].decode("utf-8")
+        offset += name_length
+        if len(data) != offset + 8 * count:
+            raise ValueError(f"{path}: запись повреждена")
+
+        recording = cls(seed, difficulty, sim_rate)
+        recording.end_step = end_step
+        recording.steps.frombytes(data[offset:offset + 4 * count])
+        recording.codes.frombytes(data[offset + 4 * count:])
+        if sys.byteorder == "big":
+            recording.steps.byteswap()
+            recording.codes.byteswap()
+        return recording
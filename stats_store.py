@@ -0,0 +1,287 @@
+"""Хранилище статистики тренажёра.
+
+Каждая игра дописывается отдельной записью в SQLite фоновым потоком,
+поэтому сохранение никогда не задерживает кадр. Сводная статистика
+(то, что показывает экран «Статистика») хранится отдельной строкой и
+периодически пересчитывается (компактируется) одной транзакцией: при
+запуске читается сводка и лишь несколько последних игр, а не вся история.
+Итоги по клавишам хранятся в отдельной таблице, которую поток записи
+обновляет вместе с каждой игрой. Всё, что показывает экран, держится в
+памяти, так что запросы не ждут поток записи.
+"""
+import copy
+import json
+import queue
+import sqlite3
+import sys
+import threading
+from collections import deque
+
+DEFAULT_STORE_PATH = "statistics.sqlite"
+LEGACY_JSON_PATH = "statistics.json"
+
+# Через сколько новых игр сводка пересчитывается
+COMPACT_EVERY = 50
+# Сколько последних игр помнится для графика точности
+TREND_LENGTH = 50
+# Сколько секунд ждать, пока база занята другим экземпляром игры
+BUSY_TIMEOUT = 5.0
+
+EMPTY_AGGREGATES = {
+    "total_games": 0,
+    "total_time": 0,
+    "best_scores": {"Легкий": 0, "Средний": 0, "Сложный": 0},
+    "average_accuracy": 0,
+    "total_keys_pressed": 0,
+    "correct_keys_pressed": 0,
+    "longest_combo": 0,
+    "last_session": None
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ended_at TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    max_combo INTEGER NOT NULL,
+    keys_pressed INTEGER NOT NULL,
+    correct_keys INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_keys (
+    session_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    presses INTEGER NOT NULL,
+    errors INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS session_keys_key ON session_keys (key);
+CREATE TABLE IF NOT EXISTS key_totals (
+    key TEXT PRIMARY KEY,
+    presses INTEGER NOT NULL,
+    errors INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    data TEXT NOT NULL,
+    compacted_upto INTEGER NOT NULL
+);
+"""
+
+SESSION_COLUMNS = ("ended_at", "difficulty", "duration", "score", "max_combo",
+                   "keys_pressed", "correct_keys")
+
+
+def apply_session(aggregates, session):
+    """Добавляет одну игру к сводной статистике."""
+    aggregates["total_games"] += 1
+    aggregates["total_time"] += session["duration"]
+    best_scores = aggregates["best_scores"]
+    best_scores[session["difficulty"]] = max(
+        best_scores.get(session["difficulty"], 0), session["score"])
+    aggregates["longest_combo"] = max(aggregates["longest_combo"], session["max_combo"])
+    aggregates["total_keys_pressed"] += session["keys_pressed"]
+    aggregates["correct_keys_pressed"] += session["correct_keys"]
+    aggregates["average_accuracy"] = round(
+        (aggregates["correct_keys_pressed"] /
+         max(1, aggregates["total_keys_pressed"])) * 100
+    )
+    aggregates["last_session"] = session["ended_at"]
+
+
+def session_accuracy(keys_pressed, correct_keys):
+    return round(correct_keys / max(1, keys_pressed) * 100)
+
+
+def load_legacy_statistics(path=LEGACY_JSON_PATH):
+    """Сводка из прежнего statistics.json; пустой или битый файл игнорируется."""
+    aggregates = copy.deepcopy(EMPTY_AGGREGATES)
+    try:
+        with open(path, "r") as f:
+            aggregates.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    return aggregates
+
+
+class StatisticsStore:
+    def __init__(self, path=DEFAULT_STORE_PATH, legacy_path=LEGACY_JSON_PATH):
+        self.path = path
+        connection = self._connect()
+        try:
+            self.aggregates = self._load_aggregates(connection, legacy_path)
+            self.recent_accuracy = self._load_recent_accuracy(connection)
+            self.key_totals = self._load_key_totals(connection)
+        finally:
+            connection.close()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="statistics-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _load_aggregates(self, connection, legacy_path):
+        row = connection.execute(
+            "SELECT data, compacted_upto FROM aggregates WHERE id = 1").fetchone()
+        if row is None:
+            # Первый запуск: переносим сводку из statistics.json
+            aggregates = load_legacy_statistics(legacy_path)
+            with connection:
+                connection.execute("INSERT INTO aggregates VALUES (1, ?, 0)",
+                                   (json.dumps(aggregates),))
+            return aggregates
+
+        aggregates, compacted_upto = json.loads(row[0]), row[1]
+        # Игры, записанные после последней компактизации
+        for session in self._sessions_after(connection, compacted_upto):
+            apply_session(aggregates, session)
+        return aggregates
+
+    @staticmethod
+    def _load_recent_accuracy(connection):
+        rows = connection.execute(
+            "SELECT keys_pressed, correct_keys FROM sessions ORDER BY id DESC LIMIT ?",
+            (TREND_LENGTH,)).fetchall()
+        return deque((session_accuracy(pressed, correct) for pressed, correct in reversed(rows)),
+                     maxlen=TREND_LENGTH)
+
+    @staticmethod
+    def _load_key_totals(connection):
+        """Итоги ``клавиша -> [нажатий, ошибок]``; в базе без таблицы итогов
+        они один раз собираются из истории."""
+        with connection:
+            if connection.execute("SELECT 1 FROM key_totals LIMIT 1").fetchone() is None:
+                connection.execute(
+                    "INSERT INTO key_totals "
+                    "SELECT key, SUM(presses), SUM(errors) FROM session_keys GROUP BY key")
+        return {key: [presses, errors] for key, presses, errors
+                in connection.execute("SELECT key, presses, errors FROM key_totals")}
+
+    @staticmethod
+    def _sessions_after(connection, session_id):
+        cursor = connection.execute(
+            f"SELECT id, {', '.join(SESSION_COLUMNS)} FROM sessions WHERE id > ? ORDER BY id",
+            (session_id,))
+        for row in cursor:
+            session = dict(zip(SESSION_COLUMNS, row[1:]))
+            session["id"] = row[0]
+            yield session
+
+    def record_session(self, session, key_stats=None):
+        """Учитывает игру в сводке сразу, а на диск пишет в фоне.
+
+        ``key_stats`` — словарь ``клавиша -> (нажатий, ошибок)``.
+        """
+        key_stats = dict(key_stats or {})
+        apply_session(self.aggregates, session)
+        self.recent_accuracy.append(
+            session_accuracy(session["keys_pressed"], session["correct_keys"]))
+        for key, (presses, errors) in key_stats.items():
+            totals = self.key_totals.setdefault(key, [0, 0])
+            totals[0] += presses
+            totals[1] += errors
+        self._queue.put(("session", dict(session), key_stats))
+
+    def flush(self):
+        """Ждёт, пока фоновый поток запишет все переданные игры."""
+        self._queue.join()
+
+    def close(self):
+        """Дожидается записи всех игр и компактирует сводку."""
+        self._queue.put(("compact",))
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        """Пишет игры из очереди.
+
+        Ошибка SQLite (например, база надолго занята другим экземпляром
+        игры) не останавливает поток: незаписанные игры остаются в очереди
+        потока и пишутся при следующей попытке — с новой игрой или при
+        закрытии хранилища.
+        """
+        connection = None
+        unwritten = []
+        failed = False
+        pending = 0
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                if item[0] == "session":
+                    unwritten.append(item[1:])
+                try:
+                    if connection is None:
+                        connection = self._connect()
+                    while unwritten:
+                        self._write_session(connection, *unwritten[0])
+                        del unwritten[0]
+                        pending += 1
+                    if pending >= COMPACT_EVERY or item[0] == "compact":
+                        self._compact(connection)
+                        pending = 0
+                    failed = False
+                except sqlite3.Error as e:
+                    if not failed:
+                        print(f"Статистика {self.path} недоступна ({e}), "
+                              f"запись будет повторена", file=sys.stderr)
+                    failed = True
+                    if connection is not None:
+                        connection.close()
+                        connection = None
+            finally:
+                self._queue.task_done()
+
+        if connection is not None:
+            connection.close()
+        if unwritten:
+            print(f"Не удалось сохранить игр в статистику: {len(unwritten)}", file=sys.stderr)
+
+    @staticmethod
+    def _write_session(connection, session, key_stats):
+        with connection:
+            cursor = connection.execute(
+                f"INSERT INTO sessions ({', '.join(SESSION_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                tuple(session[column] for column in SESSION_COLUMNS))
+            connection.executemany(
+                "INSERT INTO session_keys VALUES (?, ?, ?, ?)",
+                [(cursor.lastrowid, key, presses, errors)
+                 for key, (presses, errors) in key_stats.items()])
+            connection.executemany(
+                "INSERT INTO key_totals VALUES (?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "presses = presses + excluded.presses, errors = errors + excluded.errors",
+                [(key, presses, errors) for key, (presses, errors) in key_stats.items()])
+
+    def _compact(self, connection):
+        """Переносит новые игры в сводку одной транзакцией."""
+        with connection:
+            data, compacted_upto = connection.execute(
+                "SELECT data, compacted_upto FROM aggregates WHERE id = 1").fetchone()
+            aggregates = json.loads(data)
+            for session in self._sessions_after(connection, compacted_upto):
+                apply_session(aggregates, session)
+                compacted_upto = session["id"]
+            connection.execute(
+                "UPDATE aggregates SET data = ?, compacted_upto = ? WHERE id = 1",
+                (json.dumps(aggregates), compacted_upto))
+
+    # Запросы по истории игр (из памяти, без обращения к базе)
+
+    def accuracy_trend(self, limit=10):
+        """Точность (в %) последних ``limit`` игр (не больше ``TREND_LENGTH``),
+        от старых к новым."""
+        return list(self.recent_accuracy)[-limit:]
+
+    def key_error_rates(self, limit=None):
+        """Доля ошибочных нажатий по клавишам, начиная с худших."""
+        rates = sorted(((key, errors / presses)
+                        for key, (presses, errors) in self.key_totals.items() if presses > 0),
+                       key=lambda item: item[1], reverse=True)
+        return rates[:limit] if limit else rates
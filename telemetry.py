@@ -0,0 +1,152 @@
+"""Телеметрия нажатий: время реакции и точность по каждой клавише.
+
+Каждое событие (попадание, ошибочное нажатие, пропущенная буква)
+записывается в кольцевой буфер из заранее выделенных массивов ``array``,
+а гистограммы времени реакции и счётчики по клавишам обновляются сразу —
+перцентили и тепловая карта не требуют прохода по истории. Запись — O(1)
+и происходит только при событиях, а не в каждом кадре.
+"""
+import csv
+import math
+from array import array
+
+# Исходы нажатий
+OUTCOME_HIT = 0
+OUTCOME_WRONG_KEY = 1
+OUTCOME_MISSED = 2
+
+OUTCOME_NAMES = ("hit", "wrong_key", "missed")
+
+
+class ReactionHistogram:
+    """Гистограмма времени реакции с корзинами фиксированной ширины.
+
+    Перцентиль считается с точностью до ширины корзины; всё, что дольше
+    ``max_time``, попадает в последнюю корзину.
+    """
+
+    def __init__(self, bin_width=0.01, max_time=5.0):
+        self.bin_width = bin_width
+        self.bins = array('I', bytes(4 * (int(max_time / bin_width) + 1)))
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        index = min(len(self.bins) - 1, int(seconds / self.bin_width))
+        self.bins[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, fraction):
+        """Верхняя граница корзины, в которую попадает ``fraction`` событий."""
+        if not self.count:
+            return math.nan
+        rank = max(1, math.ceil(self.count * fraction))
+        seen = 0
+        for index, count in enumerate(self.bins):
+            seen += count
+            if seen >= rank:
+                return (index + 1) * self.bin_width
+        return len(self.bins) * self.bin_width
+
+    def clear(self):
+        for index in range(len(self.bins)):
+            self.bins[index] = 0
+        self.count = 0
+        self.total = 0.0
+
+
+class KeyStats:
+    """Счётчики и гистограмма реакции одной клавиши."""
+
+    __slots__ = ("hits", "wrong", "missed", "reactions")
+
+    def __init__(self):
+        self.hits = 0
+        self.wrong = 0
+        self.missed = 0
+        self.reactions = ReactionHistogram()
+
+    @property
+    def error_rate(self):
+        """Доля ошибок и пропусков среди всех событий клавиши."""
+        total = self.hits + self.wrong + self.missed
+        return (self.wrong + self.missed) / total if total else 0.0
+
+
+class KeyTelemetry:
+    """Кольцевой буфер событий нажатий и сводки по ним.
+
+    В буфере хранятся последние ``capacity`` событий: код символа, исход и
+    время реакции в секундах (для ошибочного нажатия — NaN, для пропуска —
+    время жизни буквы). Сводки (``reactions``, ``keys``) учитывают все
+    события с последнего ``clear``, а не только оставшиеся в буфере.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._keys = array('I', bytes(4 * capacity))
+        self._outcomes = array('B', bytes(capacity))
+        self._reactions = array('f', bytes(4 * capacity))
+        self.head = 0
+        self.count = 0
+        self.reactions = ReactionHistogram()
+        self.keys = {}
+
+    def __len__(self):
+        return self.count
+
+    def record(self, char, outcome, reaction=math.nan):
+        head = self.head
+        self._keys[head] = ord(char)
+        self._outcomes[head] = outcome
+        self._reactions[head] = reaction
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+        key_stats = self.keys.get(char)
+        if key_stats is None:
+            key_stats = self.keys[char] = KeyStats()
+        if outcome == OUTCOME_HIT:
+            key_stats.hits += 1
+            key_stats.reactions.add(reaction)
+            self.reactions.add(reaction)
+        elif outcome == OUTCOME_WRONG_KEY:
+            key_stats.wrong += 1
+        else:
+            key_stats.missed += 1
+
+    def __iter__(self):
+        """События из буфера от старых к новым: (символ, исход, реакция)."""
+        start = (self.head - self.count) % self.capacity
+        for i in range(self.count):
+            index = (start + i) % self.capacity
+            yield chr(self._keys[index]), self._outcomes[index], self._reactions[index]
+
+    def percentiles(self):
+        """p50 и p95 времени реакции на попадания, в секундах."""
+        return self.reactions.percentile(0.5), self.reactions.percentile(0.95)
+
+    def heatmap(self):
+        """Клавиша -> (доля ошибок, медиана реакции в секундах)."""
+        return {char: (stats.error_rate, stats.reactions.percentile(0.5))
+                for char, stats in self.keys.items()}
+
+    def export_csv(self, path):
+        """Записывает события буфера в CSV для анализа вне игры."""
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("key", "outcome", "reaction_ms"))
+            for char, outcome, reaction in self:
+                writer.writerow((char, OUTCOME_NAMES[outcome],
+                                 "" if math.isnan(reaction) else round(reaction * 1000, 1)))
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        self.reactions.clear()
+        self.keys = {}